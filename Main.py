@@ -19,9 +19,14 @@
 """
 
 import collections
+import copy
 import logging
+import multiprocessing
 import os
+import shutil
+import tempfile
 import time
+import numpy as np
 import pandas as pd
 
 import optimisation
@@ -91,8 +96,273 @@ selector = [9]
 # compliance checking.
 pth_busbar_list = os.path.join(project_directory, 'Model_Review.xlsx')
 
+# Handles to the loaded SAV case and element data within a worker process so that the SAV case only needs to be
+# loaded once by each process rather than for every contingency tested.
+_worker_study = dict()
+_worker_logger = None
 
-def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_busbars=str()):
+
+def get_element_data(sid):
+	"""
+		Obtains the data for all elements in the currently loaded PSSE case
+	:param int sid:  Bus subsystem to obtain the data for
+	:return collections.OrderedDict element_data:  Dictionary in the format {element:data class}
+	"""
+	element_data = collections.OrderedDict()
+	element_data['bus'] = optimisation.psse.BusData(sid=sid)
+	element_data['machine'] = optimisation.psse.MachineData(sid=sid)
+	element_data['circuit'] = optimisation.psse.BranchData(flag=2, sid=sid)
+	element_data['tx2'] = optimisation.psse.BranchData(flag=6, tx=True, sid=sid)
+	element_data['tx3'] = optimisation.psse.Tx3Data(sid=sid)
+	element_data['tx3_wind'] = optimisation.psse.Tx3WndData(sid=sid)
+	element_data['fixed_shunt'] = optimisation.psse.ShuntData(fixed=True, sid=sid)
+	element_data['switched_shunt'] = optimisation.psse.ShuntData(fixed=False, sid=sid)
+	return element_data
+
+
+def preallocate_contingency_columns(df, cont_names, values):
+	"""
+		Creates an array to hold the results of every contingency for a DataFrame so that the DataFrame does not need
+		to grow as the results for each contingency are added.  Numeric results are held as floats rather than python
+		objects with any contingency that is not populated left as NaN.
+	:param pd.DataFrame df:  DataFrame the results will be added to
+	:param list cont_names:  Names of all the contingencies that will be tested
+	:param pd.Series values:  Results for the first contingency received for this DataFrame
+	:return np.ndarray results_block:  Array with a row for each row of the DataFrame and a column for each contingency
+	"""
+	if np.issubdtype(values.infer_objects().dtype, np.floating):
+		dtype = float
+	else:
+		dtype = object
+	return np.full((len(df.index), len(cont_names)), np.nan, dtype=dtype)
+
+
+def collect_contingency_results(element_data, contingency_results, cont_names):
+	"""
+		Adds the results for each contingency to the DataFrames for the complete study as they are received
+	:param collections.OrderedDict element_data:  Dictionary in the format {element:data class}
+	:param iterable contingency_results:  Results from <run_one_contingency> for each contingency tested
+	:param list cont_names:  Names of all the contingencies that will be tested
+	:return (list, list, list) (tested_contingencies, convergence_messages, convergence_flags):  Names of the
+		contingencies in the order they were tested along with their convergence details
+	"""
+	logger = logging.getLogger(constants.Logging.logger_name)
+
+	tested_contingencies = list()
+	convergence_messages = list()
+	convergence_flags = list()
+
+	# Position of the column for each contingency in the array of results for each DataFrame, the arrays are created
+	# once the first results for that DataFrame are received and then populated in place
+	column_positions = {name: i for i, name in enumerate(cont_names)}
+	results_blocks = dict()
+	columns_populated = dict()
+
+	for name, message, convergent, results in contingency_results:
+		logger.info('Contingency {} tested'.format(name))
+		# Add the results for this contingency to the results for the complete study
+		for (element, frame), values in results.items():
+			key = (element, frame)
+			df = getattr(element_data[element], frame)
+			if key not in results_blocks:
+				results_blocks[key] = preallocate_contingency_columns(df=df, cont_names=cont_names, values=values)
+				columns_populated[key] = np.zeros(len(cont_names), dtype=bool)
+
+			# Results are written by position and so must be in the same order as the DataFrame
+			if not values.index.equals(df.index):
+				values = values.reindex(df.index)
+			position = column_positions[name]
+			try:
+				results_blocks[key][:, position] = values.to_numpy()
+			except (TypeError, ValueError):
+				# Results are not all numeric and so the results for this DataFrame are held as objects instead
+				results_blocks[key] = results_blocks[key].astype(object)
+				results_blocks[key][:, position] = values.to_numpy()
+			columns_populated[key][position] = True
+
+		# Record contingency convergence details
+		tested_contingencies.append(name)
+		convergence_messages.append(message)
+		convergence_flags.append(convergent)
+
+	# Results are added to each DataFrame in a single step, only including the contingencies which produced results
+	# for that DataFrame, e.g. machine data is not included for a non-convergent contingency
+	for (element, frame), results_block in results_blocks.items():
+		data_set = element_data[element]
+		df = getattr(data_set, frame)
+		populated = columns_populated[(element, frame)]
+		df_results = pd.DataFrame(
+			data=results_block[:, populated], index=df.index,
+			columns=[name for name, added in zip(cont_names, populated) if added]
+		)
+		setattr(data_set, frame, pd.concat([df, df_results], axis=1))
+
+	return tested_contingencies, convergence_messages, convergence_flags
+
+
+def initialise_worker(pth_logs, uid):
+	"""
+		Initialises logging for a worker process used to test contingencies in parallel, each process writes to its
+		own log files in the same directory as the main process
+	:param str pth_logs:  Path to where all log files will be stored
+	:param str uid:  Unique identifier for log files to which the process id is appended
+	:return None:
+	"""
+	global _worker_logger
+	_worker_logger = optimisation.Logger(pth_logs=pth_logs, uid='{}_{}'.format(uid, os.getpid()))
+	return None
+
+
+def get_pool(pth_logs, uid):
+	"""
+		Creates the pool of processes used to test the contingencies in parallel, each worker requires a PSSE licence
+		in addition to the licence used by this process
+	:param str pth_logs:  Path to where all log files will be stored
+	:param str uid:  Unique identifier for log files to which the process id of each worker is appended
+	:return multiprocessing.Pool pool:  Pool of processes or None if the contingencies should be tested in this process
+	"""
+	if constants.PSSE.processes > 1:
+		pool = multiprocessing.Pool(
+			processes=constants.PSSE.processes, initializer=initialise_worker, initargs=(pth_logs, uid)
+		)
+	else:
+		pool = None
+	return pool
+
+
+def copy_element_data(element_data):
+	"""
+		Copies the data for all elements so that the results can be removed from the copy for each contingency tested
+		without affecting the original
+	:param collections.OrderedDict element_data:  Dictionary in the format {element:data class}
+	:return collections.OrderedDict element_data_copy:  Dictionary in the format {element:data class}
+	"""
+	element_data_copy = collections.OrderedDict()
+	for element, data_set in element_data.items():
+		data_set_copy = copy.copy(data_set)
+		# DataFrames and lists are updated for each contingency and so are copied rather than referenced
+		for attribute, value in vars(data_set).items():
+			if isinstance(value, pd.DataFrame):
+				setattr(data_set_copy, attribute, value.copy())
+			elif isinstance(value, list):
+				setattr(data_set_copy, attribute, list(value))
+		element_data_copy[element] = data_set_copy
+	return element_data_copy
+
+
+def set_study(study_key, psse_case, element_data, snapshot_directory):
+	"""
+		Saves a snapshot of the loaded PSSE case and stores the handles to it and the element data so that they can be
+		used for every contingency tested by this process
+	:param tuple study_key:  Identifier for the study in the format (psse_sav_case, busbars_to_consider,
+		snapshot_directory)
+	:param optimisation.psse.PsseControl psse_case:  Handle for the loaded PSSE case
+	:param collections.OrderedDict element_data:  Dictionary in the format {element:data class}
+	:param str snapshot_directory:  Directory where a snapshot of the loaded case is saved for reloading between
+		contingencies
+	:return dict _worker_study:  Dictionary containing the PsseControl handle and data for all elements
+	"""
+	# Snapshot of the case saved locally for this process so that reloading between contingencies does not need to
+	# read the original SAV case
+	psse_case.save_snapshot(
+		pth_snapshot=os.path.join(snapshot_directory, '{}_{}.sav'.format(psse_case.sav_name, os.getpid()))
+	)
+
+	_worker_study.clear()
+	_worker_study['key'] = study_key
+	_worker_study['psse'] = psse_case
+	_worker_study['data'] = element_data
+
+	return _worker_study
+
+
+def load_study(psse_sav_case, busbars_to_consider, snapshot_directory):
+	"""
+		Loads the PSSE case in this process and obtains the data for all elements, if the SAV case has already been
+		loaded by this process then the existing handles are returned
+	:param str psse_sav_case:  Path to psse SAV case
+	:param tuple busbars_to_consider:  Busbars to include in the bus subsystem
+	:param str snapshot_directory:  Directory where a snapshot of the loaded case is saved for reloading between
+		contingencies
+	:return dict _worker_study:  Dictionary containing the PsseControl handle and data for all elements
+	"""
+	study_key = (psse_sav_case, busbars_to_consider, snapshot_directory)
+	if _worker_study.get('key') == study_key:
+		return _worker_study
+
+	psse_case = optimisation.psse.PsseControl()
+	psse_case.load_data_case(pth_sav=psse_sav_case)
+	psse_case.define_bus_subsystem(busbars=busbars_to_consider)
+
+	return set_study(
+		study_key=study_key, psse_case=psse_case, element_data=get_element_data(sid=psse_case.sid),
+		snapshot_directory=snapshot_directory
+	)
+
+
+def run_one_contingency(psse_sav_case, cont_spec, busbars_to_consider, adjust_reactive, snapshot_directory):
+	"""
+		Applies a single contingency to the SAV case, runs the load flows and returns the results for this
+		contingency.  Each contingency is independent and so this can be run in a separate process.
+	:param str psse_sav_case:  Path to psse SAV case
+	:param dict cont_spec:  Inputs used to initialise the <optimisation.psse.Contingency> class
+	:param tuple busbars_to_consider:  Busbars to include in the bus subsystem
+	:param bool adjust_reactive:  Whether the reactive compensation should be adjusted to maintain voltages or not
+	:param str snapshot_directory:  Directory where a snapshot of the loaded case is saved for reloading between
+		contingencies
+	:return (str, str, bool, dict) (name, message, convergent, results):  Contingency name, convergence details and
+		the results in the format {(element, DataFrame attribute):pd.Series}
+	"""
+	logger = logging.getLogger(constants.Logging.logger_name)
+
+	study = load_study(
+		psse_sav_case=psse_sav_case, busbars_to_consider=busbars_to_consider, snapshot_directory=snapshot_directory
+	)
+	psse_case = study['psse']
+	data = study['data']
+
+	contingency = optimisation.psse.Contingency(**cont_spec)
+	logger.info('Testing contingency {}'.format(contingency.name))
+	contingency.setup_contingency(
+		circuit_data=data['circuit'],
+		tx2_data=data['tx2'],
+		tx3_data=data['tx3'],
+		bus_data=data['bus'],
+		fixed_shunt_data=data['fixed_shunt'],
+		switched_shunt_data=data['switched_shunt'],
+		tx3_wind_data=data['tx3_wind']
+	)
+	contingency.test_contingency(
+		psse=psse_case, bus_data=data['bus'], circuit_data=data['circuit'], tx2_data=data['tx2'],
+		tx3_wind_data=data['tx3_wind'], machine_data=data['machine'], adjust_reactive=adjust_reactive
+	)
+
+	# Extract the results for this contingency, they are removed so that the DataFrames in this process do not grow
+	# with every contingency tested
+	results = dict()
+	for element, data_set in data.items():
+		for frame in data_set.contingency_frames:
+			df = getattr(data_set, frame)
+			if contingency.name in df.columns:
+				results[(element, frame)] = df.pop(contingency.name)
+
+	# Rather than restoring it is quicker to just reload the snapshot of the SAV case
+	# It also avoids a potential error where circuits are not necessarily switched back in
+	psse_case.load_data_case()
+
+	return contingency.name, contingency.convergence_message, contingency.convergent, results
+
+
+def _run_contingency_task(args):
+	"""
+		Unpacks the arguments for <run_one_contingency> since <multiprocessing.Pool.imap> only passes a single argument
+	:param tuple args:  Arguments for <run_one_contingency>
+	:return tuple:
+	"""
+	return run_one_contingency(*args)
+
+
+def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_busbars=str(), pool=None):
 	"""
 		Main function
 	:param str cont_workbook: Path to workbook which contains contingency details
@@ -100,6 +370,9 @@ def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_bus
 	:param str target_workbook: Path where results should be saved
 	:param bool adjust_reactive:  Whether the reactive compensation should be adjusted to maintain voltages or not
 	:param str pth_busbars:  Path to file where a list of busbars are located
+	:param multiprocessing.Pool pool: (optional=None) - Pool of processes used to test the contingencies in
+		parallel, if not provided then all contingencies are tested in this process.  If testing a contingency fails
+		then the pool is terminated.
 	:return str target_workbook:  Path to excel file created as part of study
 	"""
 
@@ -111,6 +384,7 @@ def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_bus
 		df_busbars, busbars_to_consider = optimisation.file_handling.busbars_to_consider(pth_busbar_list=pth_busbars)
 	else:
 		busbars_to_consider = tuple()
+	busbars_to_consider = tuple(busbars_to_consider)
 
 	# Initialise and load PSSE case
 	logger.info('Loading PSSE case {} and checking convergent'.format(psse_sav_case))
@@ -118,18 +392,16 @@ def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_bus
 	psse_case.load_data_case(pth_sav=psse_sav_case)
 
 	# Create a bus subsystem within PSSE to only include results for specific busbars
-	psse_case.define_bus_subsystem(busbars=tuple(busbars_to_consider))
+	psse_case.define_bus_subsystem(busbars=busbars_to_consider)
 
 	# Check have an initially convergent load flow
 	load_flow_success, islanded_busbars = psse_case.run_load_flow()
-	if not load_flow_success or not islanded_busbars.empty:
-		if not islanded_busbars.empty:
+	if not load_flow_success or islanded_busbars.size > 0:
+		if islanded_busbars.size > 0:
 			msg0 = (
 				'The loaded PSSE case {} has the following busbars islanded in the base case:'.format(psse_sav_case)
 			)
-			msg1 = '\n'.join([
-				'\t - Busbar: {}'.format(bus) for bus in islanded_busbars[optimisation.constants.Busbars.bus]
-			])
+			msg1 = '\n'.join(['\t - Busbar: {}'.format(bus) for bus in islanded_busbars.tolist()])
 			msg = '{}\n{}'.format(msg0, msg1)
 			logger.critical(msg)
 			raise ValueError('Check PSSE SAV Case - Islanded busbars')
@@ -141,23 +413,26 @@ def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_bus
 
 	# Obtain data for all elements in initial conditions (prior to any contingencies or balancing of reactive
 	# compensation)
-	bus_data = optimisation.psse.BusData(sid=psse_case.sid)
-	machine_data = optimisation.psse.MachineData(sid=psse_case.sid)
-	circuit_data = optimisation.psse.BranchData(flag=2, sid=psse_case.sid)
-	tx2_data = optimisation.psse.BranchData(flag=6, tx=True, sid=psse_case.sid)
-	tx3_data = optimisation.psse.Tx3Data(sid=psse_case.sid)
-	tx3_wind_data = optimisation.psse.Tx3WndData(sid=psse_case.sid)
-	fixed_shunt_data = optimisation.psse.ShuntData(fixed=True, sid=psse_case.sid)
-	switched_shunt_data = optimisation.psse.ShuntData(fixed=False, sid=psse_case.sid)
+	element_data = get_element_data(sid=psse_case.sid)
+	bus_data = element_data['bus']
+	machine_data = element_data['machine']
+	circuit_data = element_data['circuit']
+	tx2_data = element_data['tx2']
+	tx3_data = element_data['tx3']
+	tx3_wind_data = element_data['tx3_wind']
+	fixed_shunt_data = element_data['fixed_shunt']
+	switched_shunt_data = element_data['switched_shunt']
 
 	# Import workbook of contingency details identifying those elements which need to be switched out / switched in
 	logger.info('Importing details of all contingencies from workbook {}'.format(cont_workbook))
 	contingency_data = optimisation.file_handling.ImportContingencies(pth=cont_workbook)
 	contingency_circuits_details = collections.OrderedDict()
+	# Inputs for each contingency so that it can be reconstructed in the process where it is tested
+	contingency_specs = collections.OrderedDict()
 
 	# Process imported contingencies to identify associated elements in PSSE case and assign to a Contingency class
 	for cont_name in contingency_data.contingency_names:
-		logger.debug('Processing contingency: {}'.format(cont_name))
+		logger.debug('Processing contingency: %s', cont_name)
 
 		# Check if contingency has any busbars which should be excluded when adjusting the reactive power
 		if pth_busbars:
@@ -169,66 +444,85 @@ def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_bus
 		# Setup contingency by switching out the elements
 		circuits, tx2, tx3, busbars, fixed_shunts, switched_shunts = contingency_data.group_contingencies_by_name(
 			cont_name=cont_name)
-		contingency = optimisation.psse.Contingency(
+		cont_spec = dict(
 			circuits=circuits, tx2=tx2, tx3=tx3, busbars=busbars, fixed_shunts=fixed_shunts,
 			switched_shunts=switched_shunts, name=cont_name, busbars_to_ignore=busbars_to_ignore)
+		contingency = optimisation.psse.Contingency(**cont_spec)
 		contingency_circuits_details[cont_name] = contingency
+		contingency_specs[cont_name] = cont_spec
 	logger.info('All contingencies from workbook {} imported'.format(cont_workbook))
 
-	# Empty DataFrame to use for populating details of whether the contingency was convergent, circuit / shunt switching
-	# used to keep track of whether shunt or normal asset outage for analysis against voltage limits.
+	# Lists used to populate details of whether the contingency was convergent, starting with the base case, circuit /
+	# shunt switching used to keep track of whether shunt or normal asset outage for analysis against voltage limits.
 	circuit_switching = list()
 	shunt_switching = list()
-	contingency_convergence = pd.DataFrame(
-		index=contingency_circuits_details.keys(), columns=(constants.Excel.message, constants.Excel.convergence)
-	)
-	# Add Base case message
-	contingency_convergence.loc[constants.Contingency.bc, constants.Excel.message] = constants.Contingency.convergent
-	contingency_convergence.loc[constants.Contingency.bc, constants.Excel.convergence] = True
-
-	# Loop through all contingencies, apply outage, run load flow, check for reactive compensation requirements
-	for name, contingency in contingency_circuits_details.iteritems():
 
-		logger.info('Testing contingency {}'.format(name))
+	# Identify whether each contingency is a shunt switching or normal asset outage
+	for name, contingency in contingency_circuits_details.items():
 		if contingency.voltage_control_contingency:
 			shunt_switching.append(name)
 		else:
 			circuit_switching.append(name)
 
-		contingency.setup_contingency(
-			circuit_data=circuit_data,
-			tx2_data=tx2_data,
-			tx3_data=tx3_data,
-			bus_data=bus_data,
-			fixed_shunt_data=fixed_shunt_data,
-			switched_shunt_data=switched_shunt_data,
-			tx3_wind_data=tx3_wind_data
-		)
-		contingency.test_contingency(
-			psse=psse_case, bus_data=bus_data, circuit_data=circuit_data, tx2_data=tx2_data,
-			tx3_wind_data=tx3_wind_data, machine_data=machine_data, adjust_reactive=adjust_reactive
+	# Loop through all contingencies, apply outage, run load flow, check for reactive compensation requirements
+	# Each contingency is tested independently of the others and so can be run in parallel, imap returns the results
+	# in the same order as the contingencies are provided
+	# Temporary directory for the snapshots of the SAV case used to restore it between contingencies
+	snapshot_directory = tempfile.mkdtemp(prefix='{}_'.format(psse_case.sav_name))
+	tasks = [
+		(psse_sav_case, cont_spec, busbars_to_consider, adjust_reactive, snapshot_directory)
+		for cont_spec in contingency_specs.values()
+	]
+	if pool is None:
+		# The case and element data already loaded in this process are used rather than loading them again, the
+		# element data is copied so that removing the results for each contingency does not affect the original
+		set_study(
+			study_key=(psse_sav_case, busbars_to_consider, snapshot_directory), psse_case=psse_case,
+			element_data=copy_element_data(element_data=element_data), snapshot_directory=snapshot_directory
 		)
+		contingency_results = (_run_contingency_task(task) for task in tasks)
+	else:
+		contingency_results = pool.imap(_run_contingency_task, tasks)
 
-		# Rather than restoring it is quicker to just reload the SAV case
-		# It also avoids a potential error where circuits are not necessarily switched back in
-		psse_case.load_data_case()
-		# Update DataFrame with contingency convergence details
-		contingency_convergence.loc[name, constants.Excel.message] = contingency.convergence_message
-		contingency_convergence.loc[name, constants.Excel.convergence] = contingency.convergent
+	# The results for each contingency are added to the results for the complete study as they are received
+	try:
+		tested_contingencies, convergence_messages, convergence_flags = collect_contingency_results(
+			element_data=element_data, contingency_results=contingency_results,
+			cont_names=list(contingency_specs.keys())
+		)
+	except Exception:
+		# Remaining contingencies for this SAV case would otherwise continue to be tested by the pool using the
+		# snapshot that is about to be deleted, the pool is terminated and a new pool is needed for any further studies
+		if pool is not None:
+			pool.terminate()
+			pool.join()
+		raise
+	finally:
+		if pool is None:
+			# Handles are no longer needed once all contingencies have been tested
+			_worker_study.clear()
+		shutil.rmtree(snapshot_directory, ignore_errors=True)
+
+	# DataFrame of whether each contingency was convergent is created once all contingencies have been tested with the
+	# base case added at the end
+	contingency_convergence = pd.DataFrame(
+		data={
+			constants.Excel.message: convergence_messages + [constants.Contingency.convergent],
+			constants.Excel.convergence: convergence_flags + [True]
+		},
+		index=tested_contingencies + [constants.Contingency.bc],
+		columns=(constants.Excel.message, constants.Excel.convergence)
+	)
 
 	# Loop through all results data and confirm compliance
 	compliance = list()
 
-	# Have to check voltage step
-	df_compliance_cont_step = bus_data.check_compliance(
-		cont_names=circuit_switching, voltage_step_limit=constants.EirGridThresholds.cont_step_change_limit)
-
-	df_compliance_reactor_step = bus_data.check_compliance(
-		cont_names=shunt_switching, voltage_step_limit=constants.EirGridThresholds.reactor_step_change_limit)
-
-	# Combine compliance for voltage step due to contingency or reactor switching and add to list of all compliance
-	# flags
-	df_compliance_step_change = pd.concat([df_compliance_cont_step, df_compliance_reactor_step], axis=0)
+	# Have to check voltage step, the limit depends on whether the contingency is due to contingency or reactor
+	# switching and both are checked in a single pass before being added to the list of all compliance flags
+	step_limits = collections.OrderedDict()
+	step_limits['contingency'] = (circuit_switching, constants.EirGridThresholds.cont_step_change_limit)
+	step_limits['reactor'] = (shunt_switching, constants.EirGridThresholds.reactor_step_change_limit)
+	df_compliance_step_change = bus_data.check_compliance(step_limits=step_limits)
 	df_compliance_step_change.loc[constants.Contingency.bc] = True
 	compliance.append(df_compliance_step_change)
 
@@ -237,8 +531,12 @@ def main(cont_workbook, psse_sav_case, target_workbook, adjust_reactive, pth_bus
 	for data_set in (bus_data, circuit_data, tx2_data, tx3_wind_data):
 		compliance.append(data_set.check_compliance(cont_names=all_cont_names))
 
-	# Combine compliance results into a single dataset
-	contingency_compliance = pd.concat([contingency_convergence] + compliance, axis=1, sort=True)
+	# Combine compliance results into a single dataset, all results are aligned to a single sorted index of every
+	# contingency so that they can be combined without pandas having to join and sort the index of each
+	all_contingencies = contingency_convergence.index.sort_values()
+	contingency_compliance = pd.concat(
+		[df.reindex(all_contingencies) for df in [contingency_convergence] + compliance], axis=1, sort=False
+	)
 
 	# Data to write is formatted into a dictionary with the associated name to use
 	c = optimisation.constants.Excel
@@ -277,22 +575,43 @@ if __name__ == '__main__':
 	local_logger = log_cls.logger
 	local_logger.info('Study Started')
 
-	# Iterates through each of the SAV case / results files provided
-	for i in selector:
-		t1 = time.time()
-		pth_sav = pth_EirGrid_SAV[i]
-		pth_res = pth_results[i]
-		local_logger.info('Processing SAV case {}'.format(pth_sav))
-		try:
-			pth_excel = main(
-				cont_workbook=pth_Contingencies, psse_sav_case=pth_sav, target_workbook=pth_res,
-				pth_busbars=pth_busbar_list,
-				adjust_reactive=adjust_reactive_comp[i]
-			)
-			local_logger.info(
-				'SAV case {} completed in {:.2f}, results saved in {}'.format(pth_sav, time.time()-t1, pth_res)
-			)
-		except ValueError:
-			local_logger.error('Contingency analysis for the SAV case {} could not be completed'.format(pth_sav))
+	# Pool of processes used to test the contingencies in parallel, the same pool is used for every SAV case with each
+	# process loading the SAV case the first time it receives a contingency for it.  Each worker requires a PSSE
+	# licence in addition to the licence used by this process.  SAV cases are still processed one after another.
+	study_pool = get_pool(pth_logs=log_path, uid=uid)
+
+	try:
+		# Iterates through each of the SAV case / results files provided
+		for i in selector:
+			t1 = time.time()
+			pth_sav = pth_EirGrid_SAV[i]
+			pth_res = pth_results[i]
+			local_logger.info('Processing SAV case {}'.format(pth_sav))
+			try:
+				pth_excel = main(
+					cont_workbook=pth_Contingencies, psse_sav_case=pth_sav, target_workbook=pth_res,
+					pth_busbars=pth_busbar_list,
+					adjust_reactive=adjust_reactive_comp[i],
+					pool=study_pool
+				)
+				local_logger.info(
+					'SAV case {} completed in {:.2f}, results saved in {}'.format(pth_sav, time.time()-t1, pth_res)
+				)
+			except ValueError:
+				local_logger.error('Contingency analysis for the SAV case {} could not be completed'.format(pth_sav))
+				# The pool may have been terminated with contingencies for this SAV case still queued and so a new
+				# pool is used for the next SAV case
+				if study_pool is not None:
+					study_pool.terminate()
+					study_pool.join()
+					study_pool = get_pool(pth_logs=log_path, uid=uid)
+
+		if study_pool is not None:
+			study_pool.close()
+			study_pool.join()
+	finally:
+		# Ensures the worker processes, and the PSSE licences they are using, are released
+		if study_pool is not None:
+			study_pool.terminate()
 
 	local_logger.info('Study completed in {:.2f} seconds'.format(time.time()-t0))
@@ -30,41 +30,82 @@ __phone__ = '+44 7899 984158'
 __status__ = 'Development'
 
 
-def decorate_emit(fn):
+# Colour controls used for each level of log message in the console output
+LEVEL_COLOURS = {
+	logging.CRITICAL: '\x1b[31;1m',  # Red
+	logging.ERROR: '\x1b[31;1m',  # Red
+	logging.WARNING: '\x1b[33;1m',  # Dark yellow
+	logging.INFO: '\x1b[32;1m',  # Green
+	logging.DEBUG: '\x1b[35;1m'  # Purple
+}
+RESET_COLOUR = '\x1b[0m'
+
+
+class ColourFormatter(logging.Formatter):
 	"""
-		Function will decorate the log message to insert a colour control for the console output
-	:param fn:
-	:return:
+		Formatter which inserts a colour control into the level name and message for the console output, the record is
+		restored afterwards so the colour controls are not included in the log files
 	"""
-
-	# add methods we need to the class
-	def new(*args):
-		level_number = args[0].levelno
-		if level_number >= logging.CRITICAL:
-			# Set colour to red
-			color = '\x1b[31;1m'
-		elif level_number >= logging.ERROR:
-			# Set colour to Red
-			color = '\x1b[31;1m'
-		elif level_number >= logging.WARNING:
-			# Set colour to dark yellow
-			color = '\x1b[33;1m'
-		elif level_number >= logging.INFO:
-			# Set colour to yellow
-			color = '\x1b[32;1m'
-		elif level_number >= logging.DEBUG:
-			# Set colour to purple
-			color = '\x1b[35;1m'
-		else:
-			color = '\x1b[0m'
+	def format(self, record):
+		"""
+			Formats the record with the colour associated with its level
+		:param logging.LogRecord record:  Record to be formatted
+		:return str msg:  Formatted log message
+		"""
+		colour = LEVEL_COLOURS.get(record.levelno, RESET_COLOUR)
+		msg, levelname = record.msg, record.levelname
 
 		# Change the colour of the log messages
-		args[0].msg = "{0}{1}\x1b[0m ".format(color, args[0].msg)
-		args[0].levelname = "{0}{1}\x1b[0m ".format(color, args[0].levelname)
+		record.msg = '{}{}{} '.format(colour, msg, RESET_COLOUR)
+		record.levelname = '{}{}{} '.format(colour, levelname, RESET_COLOUR)
+		try:
+			return logging.Formatter.format(self, record)
+		finally:
+			record.msg, record.levelname = msg, levelname
+
 
-		return fn(*args)
+class BufferedFileHandler(logging.FileHandler):
+	"""
+		File handler which writes log messages to a file with a large buffer, the file is only flushed once the buffer
+		is full, a message at or above the flush_level is received or the handler is flushed / closed
+	"""
+	# Reference to the builtin open is kept so that the file can still be opened during interpreter shutdown
+	_builtin_open = open
 
-	return new
+	def __init__(self, filename, flush_level, buffer_size=constants.Logging.buffer_size, mode='a', delay=True):
+		"""
+			Initialise handler
+		:param str filename:  Path to the log file
+		:param int flush_level:  Level of log message at which the file is flushed
+		:param int buffer_size:  (optional=constants.Logging.buffer_size) - Size of the file buffer in bytes
+		:param str mode:  (optional='a') - Mode to open the file in
+		:param bool delay:  (optional=True) - If True the file is not created until the first write event occurs
+		"""
+		self.flush_level = flush_level
+		self.buffer_size = buffer_size
+		logging.FileHandler.__init__(self, filename=filename, mode=mode, delay=delay)
+
+	def _open(self):
+		"""
+			Opens the log file using the buffer size for this handler
+		:return file stream:
+		"""
+		return self._builtin_open(self.baseFilename, self.mode, self.buffer_size)
+
+	def emit(self, record):
+		"""
+			Writes the record to the file which is only flushed if the record is at or above the flush level
+		:param logging.LogRecord record:  Record to write to the log file
+		:return None:
+		"""
+		if self.stream is None:
+			self.stream = self._open()
+		try:
+			self.stream.write('{}\n'.format(self.format(record)))
+			if record.levelno >= self.flush_level:
+				self.flush()
+		except Exception:
+			self.handleError(record)
 
 
 def check_directory(pth_to_check, default_folder_name='Logs'):
@@ -175,33 +216,33 @@ class Logger:
 		logger.setLevel(logging.DEBUG)
 
 		# Produce formatter for log entries
-		log_formatter = logging.Formatter(
-			fmt='%(asctime)s - %(levelname)s - %(message)s',
-			datefmt='%Y-%m-%d %H:%M:%S')
+		log_format = '%(asctime)s - %(levelname)s - %(message)s'
+		date_format = '%Y-%m-%d %H:%M:%S'
+		log_formatter = logging.Formatter(fmt=log_format, datefmt=date_format)
 
+		# Progress log only holds a few messages in memory so that it remains up to date if the study is interrupted,
+		# the large file buffer is only used for the debug log
 		self.handler_progress_log = self.get_file_handlers(
-			pth=self.pth_progress_log, min_level=logging.INFO, _buffer=True, flush_level=logging.ERROR,
+			pth=self.pth_progress_log, min_level=logging.INFO, flush_level=logging.ERROR, hold_in_memory=True,
 			formatter=log_formatter)
 
 		self.handler_debug_log = self.get_file_handlers(
 			pth=self.pth_debug_log, min_level=logging.DEBUG, _buffer=True, flush_level=logging.CRITICAL,
-			buffer_cap=100000, formatter=log_formatter)
+			buffer_cap=100000, hold_in_memory=True, formatter=log_formatter)
 
 		self.handler_error_log = self.get_file_handlers(
 			pth=self.pth_error_log, min_level=logging.ERROR, formatter=log_formatter)
 
 		self.handler_stream_log = logging.StreamHandler()
 
-		# If running in DEBUG mode then will export all the debug logs to the window as well
-		self.handler_stream_log.setFormatter(log_formatter)
+		# If running in DEBUG mode then will export all the debug logs to the window as well, the formatter colour
+		# codes the different warning labels
+		self.handler_stream_log.setFormatter(ColourFormatter(fmt=log_format, datefmt=date_format))
 		if self.debug_mode:
 			self.handler_stream_log.setLevel(logging.DEBUG)
 		else:
 			self.handler_stream_log.setLevel(logging.INFO)
 
-		# Decorate to colour code different warning labels
-		self.handler_stream_log.emit = decorate_emit(self.handler_stream_log.emit)
-
 		# Add handlers to logger
 		logger.addHandler(self.handler_progress_log)
 		logger.addHandler(self.handler_debug_log)
@@ -251,29 +292,37 @@ class Logger:
 			handler.close()
 			del handler
 
-	def get_file_handlers(self, pth, min_level, formatter, _buffer=False, flush_level=logging.INFO, buffer_cap=10):
+	def get_file_handlers(
+			self, pth, min_level, formatter, _buffer=False, flush_level=logging.INFO, buffer_cap=10,
+			hold_in_memory=False):
 		"""
 			Function to a handler to write to the target file with our without a buffer if required
 			Files are overwritten if they already exist
 		:param str pth:  Path to the file handler to be used
 		:param int min_level: Is the minimum level that the file handler should include
-		:param bool _buffer: (optional=False)
+		:param bool _buffer: (optional=False) - If True then writes to the file are buffered and only flushed once the
+								buffer is full or a message at or above the flush_level is received
 		:param int flush_level: (optional=logging.INFO) - The level at which the log messages should be flushed
-		:param int buffer_cap:  (optional=10) - Level at which the buffer empties
+		:param int buffer_cap:  (optional=10) - Number of messages held in memory before they are written to file
+		:param bool hold_in_memory:  (optional=False) - If True then the log messages are held in memory and only
+								written to the file once buffer_cap messages are held or a message at or above the
+								flush_level is received
 		:param logging.Formatter formatter:  (optional=logging.Formatter()) - Formatter to use for the log file entries
 		:return: logging.handler handler:  Handle for new logging handler that has been created
 		"""
 		# Handler for process_log, overwrites existing files and buffers unless error message received
 		# delay=True prevents the file being created until a write event occurs
-
-		handler = logging.FileHandler(filename=pth, mode='a', delay=True)
+		if _buffer:
+			handler = BufferedFileHandler(filename=pth, flush_level=flush_level, mode='a', delay=True)
+		else:
+			handler = logging.FileHandler(filename=pth, mode='a', delay=True)
 		self.file_handlers.append(handler)
 
 		# Add formatter to log handler
 		handler.setFormatter(formatter)
 
-		# If a buffer is required then create a new memory handler to buffer before printing to file
-		if _buffer:
+		# If messages should be held until needed then create a new memory handler to hold them before writing to file
+		if hold_in_memory:
 			handler = logging.handlers.MemoryHandler(
 				capacity=buffer_cap, flushLevel=flush_level, target=handler)
 
@@ -97,6 +97,12 @@ class PSSE:
 
 	sid = 1
 
+	# Number of processes used to test contingencies in parallel, set to 1 (default) to test all contingencies in the
+	# main process.  If greater than 1 then each worker process runs its own instance of PSSE in addition to the
+	# instance in the main process which loads the case and collects the results, therefore processes + 1 PSSE
+	# licences are required.
+	processes = 1
+
 	def __init__(self):
 		self.psse_py_path = str()
 		self.psse_os_path = str()
@@ -273,6 +279,10 @@ class Logging:
 	error = 'ERROR'
 	extension = '.log'
 
+	# Size of the buffer (in bytes) used when writing to buffered log files so that the file is only written to once
+	# the buffer is full or a message at or above the flush level is received
+	buffer_size = 1 << 20
+
 	def __init__(self):
 		"""
 			Just included to avoid Pycharm error message
@@ -330,6 +340,16 @@ class Excel:
 						 'bg_color': 'red'}
 	cell_format_change = {'bold': False,
 						 'bg_color': 'green'}
+	# Cell format used for the header row and index column (matches the format used by pandas)
+	cell_format_header = {'bold': True,
+						  'border': 1,
+						  'align': 'center',
+						  'valign': 'top'}
+
+	# Options used when creating the results workbook, constant_memory writes each row to file once complete rather
+	# than holding the complete workbook in memory
+	workbook_options = {'constant_memory': True,
+						'strings_to_urls': False}
 
 	def __init__(self):
 		pass
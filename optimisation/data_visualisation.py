@@ -11,9 +11,10 @@
 """
 
 
+import matplotlib
+# Figures are only saved to file and so the non-interactive Agg backend is used, must be set before importing pyplot
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import matplotlib.cbook as cbook
-import collections
 from matplotlib.ticker import FormatStrFormatter
 import numpy as np
 import pandas as pd
@@ -58,6 +59,9 @@ col_number = 'NUMBER'
 col_lower_limit = 'LOWER_LIMIT'
 col_upper_limit = 'UPPER_LIMIT'
 
+# Set to True to adjust busbars with a 380kV nominal voltage to be based on a 400kV nominal voltage
+rebase_380kv = False
+
 # Figure constants
 c_figsize = (11.7, 8.3)  # Based on an A4 page
 c_dpi = 600  # Resolution of plot
@@ -65,11 +69,20 @@ c_fontsize = 8
 c_linewidth = 0.8
 c_violinwidth = 0.7
 c_boxplotwidth = 0.8
+# Maximum number of samples used for each busbar violin, if there are more contingencies than this then the voltages
+# are represented by this number of evenly spaced quantiles
+c_max_violin_samples = 500
+
+# Simplify the paths drawn to reduce the time taken to render the figures
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
 
-def produce_plots_voltage(source_file, taps_locked=False):
+def produce_plots_voltage(source_file, df_busbars, busbars_to_keep, taps_locked=False):
 	"""
 		Produces plots based on type of output
 	:param source_file:
+	:param pd.DataFrame df_busbars:  Details of the busbars to be plotted as returned by file_handling.busbars_to_consider
+	:param pd.Index busbars_to_keep:  Busbars to be plotted as returned by file_handling.busbars_to_consider
 	:param bool taps_locked:  Whether to run output for taps locked or in normal operation
 	:return:
 	"""
@@ -90,31 +103,49 @@ def produce_plots_voltage(source_file, taps_locked=False):
 	cols_to_drop = ['NUMBER.1', 'EXNAME', col_nominal_voltage, col_basecase, col_lower_limit, col_upper_limit]
 	index_to_drop = ['Compliant']
 
-	df_busbars, busbars_to_keep = file_handling.busbars_to_consider(pth_busbar_list=pth_busbar_list)
-
-	# Get results from contingency tool
-	df = pd.read_excel(source_file, sheet_name=sht, index_col=0)
+	# Get results from contingency tool, all required worksheets are read from the workbook in a single pass
+	sheets = file_handling.read_excel_sheets(pth=source_file, sheet_names=set((sht, sht_steady)))
+	df = file_handling.rows_to_dataframe(rows=sheets[sht], index_col=0)
 	# Drop indexes that are no longer needed
 	df.drop(index=index_to_drop, inplace=True)
+	# Contingency columns were mixed with the compliance row and so are re-inferred as numeric now it is removed
+	df = df.infer_objects()
 
-	# Where based on a 380kV nominal adjust to be based on 400kV nominal
+	# Voltage limits are only included in the steady state results
 	if taps_locked:
-		df_steady = pd.read_excel(source_file, sheet_name=sht_steady, index_col=0)
+		df_steady = file_handling.rows_to_dataframe(rows=sheets[sht_steady], index_col=0)
 		df[col_upper_limit] = df_steady.loc[:, col_upper_limit]
 		df[col_lower_limit] = df_steady.loc[:, col_lower_limit]
 
-	#df.loc[df[col_nominal_voltage] == 380.0] = df[df.select_dtypes(include=['number']).columns] * (380.0/400.0)
-
-	for bus, contingency in df_busbars['Contingency'].iteritems():
-		if not pd.isna(contingency):
-			df.loc[bus, contingency] = np.nan
+	# Numeric columns are identified once and used for both the rebasing and the contingency results to plot
+	numeric_cols = df.select_dtypes(include=['number']).columns
+
+	# Where based on a 380kV nominal adjust to be based on 400kV nominal, the p.u. voltages and limits for all affected
+	# busbars are scaled in a single operation
+	if rebase_380kv:
+		rebase = (df[col_nominal_voltage] == 380.0).to_numpy()
+		voltage_cols = numeric_cols.drop([col_nominal_voltage, 'NUMBER.1'], errors='ignore')
+		voltages = np.array(df[voltage_cols], dtype=float)
+		voltages[rebase] *= 380.0 / 400.0
+		df[voltage_cols] = voltages
+
+	# Results for the contingency associated with each busbar are removed, (busbar, contingency) pairs are converted to
+	# positions and set in a single operation ignoring any that do not exist in the results
+	bus_contingencies = df_busbars['Contingency'].dropna()
+	bus_idx = df.index.get_indexer(bus_contingencies.index)
+	col_idx = df.columns.get_indexer(bus_contingencies.values)
+	valid = (bus_idx >= 0) & (col_idx >= 0)
+	mask = np.zeros(df.shape, dtype=bool)
+	mask[bus_idx[valid], col_idx[valid]] = True
+	df = df.mask(mask)
 
 	# Extract voltage upper and lower threshold
 	thresholds = df.loc[:, [col_lower_limit, col_upper_limit]]
 
-	# Tidy / drop unnecessary entries from DataFrame
-	df.drop(columns=cols_to_drop, inplace=True)
-	df.dropna(axis=1, inplace=True)
+	# Tidy / drop unnecessary entries from DataFrame leaving only the numeric contingency results
+	df = df.loc[:, numeric_cols.drop(cols_to_drop, errors='ignore')]
+	# Contingencies with a missing voltage for any busbar are removed
+	df = df.loc[:, ~np.isnan(df.to_numpy(dtype=float)).any(axis=0)]
 
 	# Reduce list to only include those that exist in this list
 	busbars_to_keep = [int(x) for x in busbars_to_keep if x in df.index]
@@ -126,29 +157,37 @@ def produce_plots_voltage(source_file, taps_locked=False):
 	# X axis values
 	x2 = df.loc[busbars_to_keep, :].index
 
-	# Calculate box positions for boundary limits
-	stats = collections.OrderedDict()
-	for x in x2:
-		# noinspection PyUnresolvedReferences
-		stats[x] = cbook.boxplot_stats(thresholds.loc[x, :].values, labels=[x])[0]
-		stats[x]['q1'] = thresholds.loc[x, 'LOWER_LIMIT']
-		stats[x]['q3'] = thresholds.loc[x, 'UPPER_LIMIT']
+	# Calculate box positions for boundary limits, the box spans the lower to upper limit and so the statistics required
+	# by bxp are built directly from the limits
+	lower = thresholds.loc[x2, col_lower_limit].to_numpy(dtype=float)
+	upper = thresholds.loc[x2, col_upper_limit].to_numpy(dtype=float)
+	middle = (lower + upper) / 2.0
+	stats = [
+		{'q1': lo, 'q3': hi, 'med': med, 'mean': med, 'whislo': lo, 'whishi': hi, 'fliers': [], 'label': x}
+		for x, lo, hi, med in zip(x2, lower, upper, middle)
+	]
 
 	# #error_points = [1.0 for x in x_categories]
 
 	# Produce violin plot of busbar voltages
-	# Y axis values containing all busbar voltages for each contingency of selected busbars
-	y2 = df.loc[x2, :].T.values
+	# Y axis values containing all busbar voltages for each contingency of selected busbars, extracted as a single
+	# contiguous array with a row for each busbar and then split into an array for each busbar with any NaN removed
+	voltages = np.ascontiguousarray(df.reindex(index=x2).to_numpy(dtype=float))
+	y2 = [v[~np.isnan(v)] for v in voltages]
+	# Reduce the number of samples for each busbar, the quantiles include the minimum and maximum voltages
+	quantiles = np.linspace(0.0, 1.0, c_max_violin_samples)
+	y2 = [np.quantile(v, quantiles) if v.size > c_max_violin_samples else v for v in y2]
 	vp = ax2.violinplot(y2, showmedians=False, showextrema=True, widths=c_violinwidth)
-	# Adjust violin plot colours
+	# Adjust violin plot colours and rasterize the violin bodies
 	for pc in vp['bodies']:
 		pc.set_facecolor('green')
+		pc.set_rasterized(True)
 	vp['cbars'].set_linewidth(c_linewidth)
 	vp['cmaxes'].set_linewidth(c_linewidth)
 	vp['cmins'].set_linewidth(c_linewidth)
 
 	_ = ax2.bxp(
-		stats.values(), showcaps=False, medianprops={'linewidth': 0}, boxprops={'linewidth': c_linewidth},
+		stats, showcaps=False, medianprops={'linewidth': 0}, boxprops={'linewidth': c_linewidth},
 		whiskerprops={'linewidth': 0}, widths=c_boxplotwidth
 	)
 
@@ -173,12 +212,17 @@ def produce_plots_voltage(source_file, taps_locked=False):
 
 
 if __name__ == '__main__':
+	# Busbars to plot are the same for all results files and so only read once
+	plot_busbars, plot_busbars_to_keep = file_handling.busbars_to_consider(pth_busbar_list=pth_busbar_list)
+
 	for i in selector:
 		res_file = source_files[i]
 
 		if os.path.isfile(res_file):
 			# Output run twice, once with taps locked and once with them in automatic mode
-			produce_plots_voltage(source_file=res_file, taps_locked=False)
-			produce_plots_voltage(source_file=res_file, taps_locked=True)
+			produce_plots_voltage(
+				source_file=res_file, df_busbars=plot_busbars, busbars_to_keep=plot_busbars_to_keep, taps_locked=False)
+			produce_plots_voltage(
+				source_file=res_file, df_busbars=plot_busbars, busbars_to_keep=plot_busbars_to_keep, taps_locked=True)
 		else:
 			print('File <{}> does not exist'.format(res_file))
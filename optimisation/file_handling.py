@@ -10,9 +10,12 @@
 """
 
 import logging
+import numpy as np
+import openpyxl
 import pandas as pd
 import os
 import string
+import xlsxwriter
 
 import optimisation.constants as constants
 
@@ -33,6 +36,86 @@ def colstring_number(col):
 	return num
 
 
+def read_excel_sheets(pth, sheet_names):
+	"""
+		Function reads the values from each of the requested worksheets.  The workbook is opened in read only mode so
+		that the worksheets are streamed rather than the complete workbook being loaded into memory and is only opened
+		once no matter how many worksheets are read
+	:param str pth:  Path to the workbook to be read
+	:param iterable sheet_names:  Names of the worksheets to read
+	:return dict sheets:  Dictionary in the format {sheet:list of rows}, entirely blank rows are skipped
+	"""
+	workbook = openpyxl.load_workbook(filename=pth, read_only=True, data_only=True)
+	try:
+		sheets = dict()
+		for sht in sheet_names:
+			sheets[sht] = [
+				list(row) for row in workbook[sht].iter_rows(values_only=True) if any(x is not None for x in row)
+			]
+	finally:
+		# Workbooks opened in read only mode keep the file open until closed
+		workbook.close()
+
+	return sheets
+
+
+def rows_to_dataframe(rows, names=None, index_col=None):
+	"""
+		Function converts the rows read from a worksheet into a DataFrame using the first row as the header in the same
+		way as <pd.read_excel>
+	:param list rows:  List of rows as returned by <read_excel_sheets>
+	:param list names: (optional=None) - Column names to use instead of the header row
+	:param int index_col: (optional=None) - Position of the column to use as the index
+	:return pd.DataFrame df:
+	"""
+	if rows:
+		header = rows[0]
+		data = rows[1:]
+	else:
+		header = list()
+		data = list()
+
+	if names is None:
+		# Blank headers and duplicated headers are renamed in the same way as pandas
+		columns = list()
+		for i, col in enumerate(header):
+			if col is None:
+				col = 'Unnamed: {}'.format(i)
+			new_col = col
+			count = 0
+			while new_col in columns:
+				count += 1
+				new_col = '{}.{}'.format(col, count)
+			columns.append(new_col)
+
+		# Drop any trailing columns which have neither a header nor any data
+		while columns and header[len(columns) - 1] is None and all(
+				len(row) < len(columns) or row[len(columns) - 1] is None for row in data
+		):
+			columns.pop()
+	else:
+		columns = list(names)
+
+	# Ensure every row matches the number of columns with empty cells populated as NaN in the same way as pandas
+	width = len(columns)
+	data = [[np.nan if x is None else x for x in (row + [None] * width)[:width]] for row in data]
+	df = pd.DataFrame(data=data, columns=columns)
+
+	# Columns which mix numbers and booleans (i.e. the compliance row in the results) are converted to numeric values
+	for col in df.columns[(df.dtypes == object) & (df.count() > 0)]:
+		try:
+			df[col] = pd.to_numeric(df[col])
+		except (ValueError, TypeError):
+			pass
+
+	if index_col is not None:
+		df.set_index(columns[index_col], inplace=True)
+		if names is None and header[index_col] is None:
+			df.index.name = None
+
+	return df
+
+
 class ImportContingencies:
 
 	def __init__(self, pth):
@@ -62,35 +145,33 @@ class ImportContingencies:
 			Function to import the workbook and deal with all the processing
 		:return:
 		"""
-		# xl = pd.ExcelFile(self.pth)
+		# All worksheets read from the workbook in a single pass
+		sheets = read_excel_sheets(pth=self.pth, sheet_names=(
+			self.c.circuit, self.c.tx2, self.c.tx3, self.c.busbars, self.c.fixed_shunts, self.c.switched_shunts
+		))
+
 		# Get circuit contingencies
-		self.circuits = pd.read_excel(
-			self.pth, sheet_name=self.c.circuit, header=0,
-			names=self.c.columns[self.c.circuit]
-		)
+		self.circuits = rows_to_dataframe(rows=sheets[self.c.circuit], names=self.c.columns[self.c.circuit])
 		self.circuits[self.c.id] = self.circuits[self.c.id].apply(lambda x: '{0:.0f}'.format(x) if isinstance(x, float) else x)
 
 		# Get 2 winding transformer contingencies
-		self.tx2 = pd.read_excel(self.pth, sheet_name=self.c.tx2, header=0,
-								 names=self.c.columns[self.c.tx2])
+		self.tx2 = rows_to_dataframe(rows=sheets[self.c.tx2], names=self.c.columns[self.c.tx2])
 		self.tx2[self.c.id] = self.tx2[self.c.id].apply(lambda x: '{0:.0f}'.format(x) if isinstance(x, float) else x)
 
 		# Get 3 winding transformer contingencies
-		self.tx3 = pd.read_excel(self.pth, sheet_name=self.c.tx3, header=0,
-								 names=self.c.columns[self.c.tx3])
+		self.tx3 = rows_to_dataframe(rows=sheets[self.c.tx3], names=self.c.columns[self.c.tx3])
 		self.tx3[self.c.id] = self.tx3[self.c.id].apply(lambda x: '{0:.0f}'.format(x) if isinstance(x, float) else x)
 
 		# Get busbar contingencies
-		self.busbars = pd.read_excel(self.pth, sheet_name=self.c.busbars, header=0,
-									 names=self.c.columns[self.c.busbars])
+		self.busbars = rows_to_dataframe(rows=sheets[self.c.busbars], names=self.c.columns[self.c.busbars])
 
 		# Get shunt contingencies
-		self.fixed_shunts = pd.read_excel(self.pth, sheet_name=self.c.fixed_shunts, header=0,
-										  names=self.c.columns[self.c.fixed_shunts])
+		self.fixed_shunts = rows_to_dataframe(rows=sheets[self.c.fixed_shunts], names=self.c.columns[self.c.fixed_shunts])
 		self.fixed_shunts[self.c.id] = self.fixed_shunts[self.c.id].apply(lambda x: '{0:.0f}'.format(x) if isinstance(x, float) else x)
 
-		self.switched_shunts = pd.read_excel(self.pth, sheet_name=self.c.switched_shunts, header=0,
-											 names=self.c.columns[self.c.switched_shunts])
+		self.switched_shunts = rows_to_dataframe(
+			rows=sheets[self.c.switched_shunts], names=self.c.columns[self.c.switched_shunts]
+		)
 		self.switched_shunts[self.c.id] = self.switched_shunts[self.c.id].apply(lambda x: '{0:.0f}'.format(x) if isinstance(x, float) else x)
 
 		# Extract unique list of all contingencies being considered
@@ -157,22 +238,26 @@ class ExportResults:
 				raise WindowsError('The process cannot access the file because it is being used by another process: {}'
 								   .format(self.pth))
 
-		# Write all data to same workbook on different sheets
-		with pd.ExcelWriter(path=self.pth, engine='xlsxwriter') as excel_writer:
+		# Write all data to same workbook on different sheets.  Workbook is written in constant memory mode and so each
+		# row is written to file as soon as it is complete, rows must therefore be written in order
+		workbook = xlsxwriter.Workbook(self.pth, constants.Excel.workbook_options)
+		try:
 			# Set format for conditional formatting
-			book = excel_writer.book
-			format_error = book.add_format(constants.Excel.cell_format_error)
-			format_change = book.add_format(constants.Excel.cell_format_change)
+			format_error = workbook.add_format(constants.Excel.cell_format_error)
+			format_change = workbook.add_format(constants.Excel.cell_format_change)
+			format_header = workbook.add_format(constants.Excel.cell_format_header)
 
 			# Write convergence DataFrame
-			convergence.to_excel(excel_writer, sheet_name=constants.Excel.convergence)
+			self.write_sheet(workbook=workbook, sheet_name=constants.Excel.convergence, df=convergence,
+							 cell_format_header=format_header)
 
-			for sht, df in results.iteritems():
+			for sht, df in results.items():
 				df.sort_index(axis=0, ascending=True, inplace=True)
-				df.to_excel(excel_writer, sheet_name=sht)
+				worksheet = self.write_sheet(workbook=workbook, sheet_name=sht, df=df, cell_format_header=format_header)
 				# Also writes copy of data in transposed state so can filter for non-compliance
 				# Does not include conditional formatting
-				df.T.to_excel(excel_writer, sheet_name='{}_T'.format(sht))
+				self.write_sheet(workbook=workbook, sheet_name='{}_T'.format(sht), df=df.T,
+								 cell_format_header=format_header)
 
 				# Get conditional formatting when DataFrame isn't empty
 				if not df.empty:
@@ -180,8 +265,56 @@ class ExportResults:
 						df=df, cell_format_error=format_error, cell_format_change=format_change
 					)
 					if data_range:
-						worksheet = excel_writer.sheets[sht]
 						worksheet.conditional_format(data_range, criteria)
+		finally:
+			workbook.close()
+
+	@staticmethod
+	def cell_value(value):
+		"""
+			Function converts a value from a DataFrame into a value that can be written to excel in the same way as
+			pandas, empty values are returned as None and are not written
+		:param value:  Value to be converted
+		:return value:
+		"""
+		if isinstance(value, (bool, np.bool_)):
+			value = bool(value)
+		elif isinstance(value, (int, np.integer)):
+			value = int(value)
+		elif isinstance(value, (float, np.floating)):
+			if np.isnan(value):
+				value = None
+			elif np.isinf(value):
+				value = 'inf' if value > 0 else '-inf'
+			else:
+				value = float(value)
+		elif value is not None and pd.isnull(value):
+			value = None
+		return value
+
+	def write_sheet(self, workbook, sheet_name, df, cell_format_header):
+		"""
+			Function writes the DataFrame to a new worksheet row by row in the same layout as <pd.DataFrame.to_excel>
+		:param xlsxwriter.Workbook workbook:  Workbook to add the worksheet to
+		:param str sheet_name:  Name of the worksheet
+		:param pd.DataFrame df:  DataFrame to be written
+		:param xlsxwriter.format cell_format_header:  Format to use for the header row and index column
+		:return xlsxwriter.worksheet worksheet:  Handle to the worksheet that has been written
+		"""
+		worksheet = workbook.add_worksheet(sheet_name)
+
+		# Header row with the index name in the first column
+		if df.index.name is not None:
+			worksheet.write(0, 0, self.cell_value(df.index.name), cell_format_header)
+		for col, value in enumerate(df.columns, start=1):
+			worksheet.write(0, col, self.cell_value(value), cell_format_header)
+
+		# Each row written in turn with the index in the first column
+		for row, values in enumerate(df.itertuples(index=True, name=None), start=1):
+			worksheet.write(row, 0, self.cell_value(values[0]), cell_format_header)
+			worksheet.write_row(row, 1, [self.cell_value(x) for x in values[1:]])
+
+		return worksheet
 
 	def get_conditional_formatting(self, df, cell_format_error, cell_format_change):
 		"""
@@ -261,8 +394,8 @@ def busbars_to_consider(pth_busbar_list):
 	"""
 
 	# Get list of busbars to be plotted
-	#df_busbars = pd.read_excel(pth_busbar_list, sheet_name='Busbars', engine='openpyxl')
-	df_busbars = pd.read_excel(pth_busbar_list, sheet_name='Busbars', index_col=0, header=0)
+	sht = 'Busbars'
+	df_busbars = rows_to_dataframe(rows=read_excel_sheets(pth=pth_busbar_list, sheet_names=(sht,))[sht], index_col=0)
 
 	# Reduce dataframe to only be those which are labelled as keep
 	df_busbars = df_busbars.loc[df_busbars['Include'] == 1]
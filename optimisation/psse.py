@@ -20,6 +20,48 @@ import numpy as np
 import pandas as pd
 
 
+def within_rating(loading, rating, ignore):
+	"""
+		Function checks for each contingency whether the loading of every element is less than its rating, an element
+		with a NaN loading is treated as not being compliant
+	:param np.ndarray loading:  Array of loadings with a row for each element and a column for each contingency
+	:param np.ndarray rating:  Array of ratings with a single column and a row for each element
+	:param np.ndarray ignore:  Boolean array with a single column which is True for elements that should be ignored
+	:return np.ndarray compliant:  Boolean array which is True for each contingency where all elements are compliant
+	"""
+	return ((loading < rating) | ignore).all(axis=0)
+
+
+def within_limits(values, lower, upper):
+	"""
+		Function checks for each contingency whether the value for every element is within the limits, an element
+		with a NaN value is treated as not being compliant
+	:param np.ndarray values:  Array of values with a row for each element and a column for each contingency
+	:param np.ndarray lower:  Lower limits, either a scalar, an array with a single column and a row for each element
+								or an array with a value for each contingency
+	:param np.ndarray upper:  Upper limits, either a scalar, an array with a single column and a row for each element
+								or an array with a value for each contingency
+	:return np.ndarray compliant:  Boolean array which is True for each contingency where all elements are compliant
+	"""
+	return ((values >= lower) & (values <= upper)).all(axis=0)
+
+
+def set_contingency_row(df, row, cont_names, values):
+	"""
+		Function sets the values of a row for each contingency, adding the row if it does not already exist.  The
+		results for each contingency are stored as floats and so are converted to objects first since the row may
+		contain True / False values.
+	:param pd.DataFrame df:  DataFrame with a column for each contingency
+	:param str row:  Label of the row to set
+	:param list cont_names:  List of the contingencies to set the values for
+	:param np.ndarray values:  Values to set with a value for each contingency
+	:return None:
+	"""
+	df[cont_names] = df[cont_names].astype(object)
+	df.loc[row, cont_names] = values
+	return None
+
+
 class InitialisePsspy:
 	"""
 		Class to deal with the initialising of PSSE by checking the correct directory is being referenced and has been
@@ -97,6 +139,9 @@ class BranchData:
 	"""
 		Branch data
 	"""
+	# DataFrames which have a column added for the results of each contingency
+	contingency_frames = ('df_status', 'df_loading')
+
 	def __init__(self, flag, tx=False, sid=-1):
 		"""
 
@@ -317,33 +362,27 @@ class BranchData:
 			self.logger.warning('{}\n{}'.format(msg0, msg1))
 
 		# Steady state validation
-		compliance = dict()
-
-		# Loop through each contingency and check if all steady state circuit loadings are within limits
-		df_loading = self.df_loading
-		df_loading.loc[:, 'Threshold'] = constants.EirGridThresholds.rating_threshold
-
-		for cont in cont_names:
-			# Check to see if loading is less than rating where rating is > the EirGrid threshold value
-			condition = ((self.df_loading[cont] < self.df_loading[constants.Contingency.rate_for_checking]) |
-						 (constants.EirGridThresholds.rating_threshold ==
-						  df_loading[constants.Contingency.rate_for_checking]))
-
-			# Check compliant at all busbars
-			compliance[cont] = all(np.where(condition, True, False))
+		self.df_loading.loc[:, 'Threshold'] = constants.EirGridThresholds.rating_threshold
+
+		# Check all contingencies at once to see if loading is less than rating where rating is > the EirGrid
+		# threshold value
+		rating = self.df_loading[[constants.Contingency.rate_for_checking]].to_numpy(dtype=float)
+		compliance = within_rating(
+			loading=self.df_loading[cont_names].to_numpy(dtype=float),
+			rating=rating,
+			ignore=rating == constants.EirGridThresholds.rating_threshold
+		)
 
 		# Update DataFrame with new row to show whether compliant
-		for key, value in compliance.iteritems():
-			self.df_loading.loc[constants.Contingency.compliant, key] = value
+		set_contingency_row(
+			df=self.df_loading, row=constants.Contingency.compliant, cont_names=cont_names, values=compliance)
 
 		# Return slice from DataFrame showing whether this dataframe is compliant
 		if self.tx:
 			col_title = constants.Excel.tx2_loading
 		else:
 			col_title = constants.Excel.circuit_loading
-		df_compliance = pd.DataFrame(index=cont_names, columns=(col_title,))
-		df_compliance[col_title] = self.df_loading.loc[constants.Contingency.compliant,
-													   cont_names]
+		df_compliance = pd.DataFrame(data=compliance, index=cont_names, columns=(col_title,))
 
 		return df_compliance
 
@@ -352,6 +391,9 @@ class ShuntData:
 	"""
 		Shunt data
 	"""
+	# DataFrames which have a column added for the results of each contingency
+	contingency_frames = ('df_status',)
+
 	def __init__(self, flag=4, sid=-1, fixed=True):
 		"""
 		:param int flag: 4 for all fixed bus shunts
@@ -521,6 +563,9 @@ class Tx3WndData:
 		For the 3 phase transformers ratings are determined on a winding basis rather than total transformer.  It
 		should generally be winding 1 that is the limiting factor
 	"""
+	# DataFrames which have a column added for the results of each contingency
+	contingency_frames = ('df_status', 'df_loading')
+
 	def __init__(self, flag=3, sid=-1):
 		"""
 		:param int flag: 3 for all windings of 3 winding transformers
@@ -641,26 +686,22 @@ class Tx3WndData:
 			self.logger.warning('{}\n{}'.format(msg0, msg1))
 
 		# Steady state validation
-		compliance = dict()
-		# Loop through each contingency and check if all steady state voltages are within limits
-		for cont in cont_names:
-			# Check to see if loading is less than rating where rating is > the EirGrid threshold value
-			condition = ((self.df_loading[cont] < self.df_loading[constants.Contingency.rate_for_checking]) |
-						 (self.df_loading[constants.Contingency.rate_for_checking] <=
-						  constants.EirGridThresholds.rating_threshold))
-
-			# Check compliant at all busbars
-			compliance[cont] = all(np.where(condition, True, False))
+		# Check all contingencies at once to see if loading is less than rating where rating is > the EirGrid
+		# threshold value
+		rating = self.df_loading[[constants.Contingency.rate_for_checking]].to_numpy(dtype=float)
+		compliance = within_rating(
+			loading=self.df_loading[cont_names].to_numpy(dtype=float),
+			rating=rating,
+			ignore=rating <= constants.EirGridThresholds.rating_threshold
+		)
 
 		# Update DataFrame with new row to show whether compliant
-		for key, value in compliance.iteritems():
-			self.df_loading.loc[constants.Contingency.compliant, key] = value
+		set_contingency_row(
+			df=self.df_loading, row=constants.Contingency.compliant, cont_names=cont_names, values=compliance)
 
 		# Return slice from DataFrame showing whether each contingency is compliant
 		col_title = constants.Excel.tx3_loading
-		df_compliance = pd.DataFrame(index=cont_names, columns=(col_title,))
-		df_compliance[col_title] = self.df_loading.loc[constants.Contingency.compliant,
-													   cont_names]
+		df_compliance = pd.DataFrame(data=compliance, index=cont_names, columns=(col_title,))
 
 		return df_compliance
 
@@ -669,6 +710,8 @@ class Tx3Data:
 	"""
 		Tx3 Data
 	"""
+	# DataFrames which have a column added for the results of each contingency
+	contingency_frames = ('df',)
 
 	def __init__(self, flag=2, sid=-1):
 		"""
@@ -826,6 +869,8 @@ class BusData:
 	"""
 		Stores busbar data
 	"""
+	# DataFrames which have a column added for the results of each contingency
+	contingency_frames = ('df_state', 'df_voltage_steady', 'df_voltage_step')
 
 	def __init__(self, flag=2, sid=-1):
 		"""
@@ -1031,12 +1076,12 @@ class BusData:
 		"""
 			Function to change the status of the busbars associated with this contingency to reflect their out of
 			service status
-		:param pd.DataFrame() buses:  DataFrame containing the busbars which were islanded and the new state
+		:param np.ndarray buses:  Array of the busbar numbers which were islanded
 		:param str cont_name: Name of contingency that this relates to
 		:return:
 		"""
-		# check if cont_name already in DataFrame and if not add it populated with the initial status values
-		self.df_state[cont_name] = buses[self.c.state]
+		# Add column for this contingency populated with the initial status values of the islanded busbars
+		self.df_state[cont_name] = self.df_state[self.c.state].where(self.df_state.index.isin(buses))
 
 	def update_voltages(self, cont_name, voltage_step, non_convergence=False):
 		"""
@@ -1048,7 +1093,7 @@ class BusData:
 		"""
 		# If non-convergence then set every value to this value
 		if non_convergence:
-			self.logger.debug('Non convergence = {}'.format(non_convergence))
+			self.logger.debug('Non convergence = %s', non_convergence)
 			# Assumes non-convergent is the same in all cases
 			latest_voltages = np.nan
 		else:
@@ -1064,79 +1109,72 @@ class BusData:
 
 		return None
 
-	def check_compliance(self, cont_names, voltage_step_limit=None):
+	def check_compliance(self, cont_names=None, voltage_step_limit=None, step_limits=None):
 		"""
 			Function inserts a row at the top of the DataFrame which confirms whether the
 			voltages are all withing limits
 		:param list cont_names:  List of all the contigencies and therefore those which should be considered for the
-								validation
+								validation (not required if step_limits are provided)
 		:param float voltage_step_limit:  (optional=None) if value is provided then needs to be maximum change
 								between pre- and post-contingency voltage step with limit being dependant on whether
 								relates to a voltage step change.  If no value provided then just looks at
 								steady state
+		:param dict step_limits:  (optional=None) if provided then checks the voltage step change for several groups of
+								contingencies in a single pass, in the format {group:(cont_names, voltage_step_limit)}
 		:return pd.DataFrame contingency_compliance:  Returns a DataFrame with index=Contingency, column=type and
 														True/False for each contingency to determine whether it was
 														compliant to this test
 		"""
 		# Return slice from DataFrame showing whether this dataframe is compliant
-		# Steady state validation
-		compliance = dict()
-
 		rows_to_ignore = [constants.Contingency.v_step_lbl, constants.Contingency.compliant]
 
+		# A single step limit is checked as a single group
+		if step_limits is None and voltage_step_limit is not None:
+			step_limits = {None: (cont_names, voltage_step_limit)}
+
 		# Only check for steady state voltages if no limit provided
-		if voltage_step_limit is None:
-			# Empty DataFrame that will be populated with compliance data
-			df_compliance = pd.DataFrame(index=cont_names, columns=(constants.Excel.voltage_steady,))
-			# Loop through each contingency and check if all steady state voltages are within limits
-			for cont in cont_names:
-				# Condition for check
-				condition = ((self.df_voltage_steady[cont] <= self.df_voltage_steady[self.c.upper_limit]) &
-							(self.df_voltage_steady[cont] >= self.df_voltage_steady[self.c.lower_limit]))
-				# Check compliant at all busbars
-				compliance[cont] = all(np.where(condition, True, False))
+		if step_limits is None:
+			# Check all contingencies at once to see if all steady state voltages are within limits
+			compliance = within_limits(
+				values=self.df_voltage_steady[cont_names].to_numpy(dtype=float),
+				lower=self.df_voltage_steady[[self.c.lower_limit]].to_numpy(dtype=float),
+				upper=self.df_voltage_steady[[self.c.upper_limit]].to_numpy(dtype=float)
+			)
 
 			# Update DataFrame with new row to show whether compliant
-			for key, value in compliance.iteritems():
-				self.df_voltage_steady.loc[constants.Contingency.compliant, key] = value
+			set_contingency_row(
+				df=self.df_voltage_steady, row=constants.Contingency.compliant, cont_names=cont_names,
+				values=compliance)
 
-			df_compliance[constants.Excel.voltage_steady] = self.df_voltage_steady.loc[constants.Contingency.compliant,
-																					   cont_names]
+			df_compliance = pd.DataFrame(data=compliance, index=cont_names, columns=(constants.Excel.voltage_steady,))
 		else:
-			# Empty DataFrame that will be populated with compliance data
-			df_compliance = pd.DataFrame(index=cont_names, columns=(constants.Excel.voltage_step,))
-
 			# Step change validation
-			compliance = dict()
+			# Contingencies from every group are checked together with the limit that applies to each contingency
+			cont_names = list()
+			limits = list()
+			for group_cont_names, limit in step_limits.values():
+				cont_names.extend(group_cont_names)
+				limits.extend([limit] * len(group_cont_names))
+			limits = np.array(limits, dtype=float)
 
-			# #compliance[constants.Contingency.bc] = True
 			# Skips base case since base case must be compliant
 			# Removes rows that shouldn't be considered in comparison
 			bad_df = self.df_voltage_step.index.isin(rows_to_ignore)
-			# Calculate voltage step by subtracting base_case values
-			df_volt_step = abs(self.df_voltage_step.loc[~bad_df, cont_names].sub(self.df_voltage_step[self.c.voltage], axis=0))
+			# Calculate voltage step by subtracting base_case values for all contingencies at once
+			voltages = self.df_voltage_step.loc[~bad_df, cont_names].to_numpy(dtype=float)
+			base_voltages = self.df_voltage_step.loc[~bad_df, [self.c.voltage]].to_numpy(dtype=float)
 			# Check whether compliant with step change for contingency
-			# #condition = ((self.df_voltage_step[cont] <= voltage_step_limit) |
-			# #			 (self.df_voltage_step[cont] == False))
-			condition = df_volt_step <= voltage_step_limit
-
-			for cont in cont_names:
-
-				# #condition = (abs(self.df_voltage_step[cont] - self.df_voltage_step[self.c.voltage])
-				# #			 < voltage_step_limit)
-				# Check compliant at all busbars
-				compliance[cont] = all(np.where(condition[cont], True, False))
+			compliance = within_limits(values=np.abs(voltages - base_voltages), lower=-np.inf, upper=limits)
 
-			# Update DataFrame with new row to show whether compliant
-			for key, value in compliance.iteritems():
-				# Set the compliant flag for this contingency
-				self.df_voltage_step.loc[constants.Contingency.compliant, key] = value
-				# Add in label that identifies the limit that applied to this contingency
-				self.df_voltage_step.loc[constants.Contingency.v_step_lbl, key] = voltage_step_limit
+			# Update DataFrame with new row to show whether compliant and a row that identifies the limit that applied
+			# to each contingency
+			set_contingency_row(
+				df=self.df_voltage_step, row=constants.Contingency.compliant, cont_names=cont_names,
+				values=compliance)
+			set_contingency_row(
+				df=self.df_voltage_step, row=constants.Contingency.v_step_lbl, cont_names=cont_names, values=limits)
 
-			df_compliance[constants.Excel.voltage_step] = self.df_voltage_step.loc[
-				constants.Contingency.compliant, cont_names
-			]
+			df_compliance = pd.DataFrame(data=compliance, index=cont_names, columns=(constants.Excel.voltage_step,))
 
 		return df_compliance
 
@@ -1168,6 +1206,8 @@ class MachineData:
 	"""
 		Stores machine data
 	"""
+	# DataFrames which have a column added for the results of each contingency
+	contingency_frames = ('df_loading',)
 
 	def __init__(self, flag=4, sid=-1):
 		"""
@@ -1408,7 +1448,7 @@ class Contingency:
 		if self.name == constants.Contingency.bc:
 			self.setup_correctly = True
 			self.logger.debug(
-				'Contingency {} is the base case and therefore no switching actions have taken place'.format(self.name)
+				'Contingency %s is the base case and therefore no switching actions have taken place', self.name
 			)
 			return None
 
@@ -1482,19 +1522,19 @@ class Contingency:
 
 		# If using to establish reactive compensation requirement initially set machine output to 0 Mvar
 		if constants.ReactiveCompensationLimits.target_shunts:
-			for _, machine in constants.ReactiveCompensationLimits.target_machines.iteritems():
+			for _, machine in constants.ReactiveCompensationLimits.target_machines.items():
 				machine_data.change_output(bus_num=machine[0], machine_id=machine[1])
 
 		# Run a load flow and check for convergence along with any islanded busbars
 		convergent_load_flow, islanded_buses = psse.run_load_flow(lock_taps=True)
 
 		# If any busbars islanded then update bus_data before repeating load flow study
-		if not islanded_buses.empty:
+		if islanded_buses.size > 0:
 			bus_data.add_islanded_busbars(buses=islanded_buses, cont_name=self.name)
 
 			# Repeat load flow to confirm now convergent and no errors
 			convergent_load_flow, islanded_buses = psse.run_load_flow(lock_taps=True)
-			if not islanded_buses.empty:
+			if islanded_buses.size > 0:
 				raise SyntaxError('Have managed to still have islanded busbars on second run so issue with script')
 
 		if not convergent_load_flow:
@@ -1599,7 +1639,7 @@ class Contingency:
 			targets_log[target_bus] = target_voltage
 
 			# Iterate through each machine and change values
-			for _, machine in c.target_machines.iteritems():
+			for _, machine in c.target_machines.items():
 				if c.target_shunts:
 					machine_data.change_output(bus_num=machine[0], machine_id=machine[1], q_target=target_q)
 				else:
@@ -1651,12 +1691,14 @@ class PsseControl:
 		self.sav = str()
 		self.sav_name = str()
 		self.sid = -1
+		# Path to a snapshot of the loaded case which is used in preference to the original SAV case when reloading
+		self.pth_snapshot = str()
 
 	def load_data_case(self, pth_sav=None):
 		"""
 			Load the study case that PSSE should be working with
 		:param str pth_sav:  (optional=None) Full path to SAV case that should be loaded
-							if blank then it will reload previous
+							if blank then it will reload previous (or the snapshot of it if one has been saved)
 		:return None:
 		"""
 		try:
@@ -1672,11 +1714,12 @@ class PsseControl:
 
 		# Allows case to be reloaded
 		if pth_sav is None:
-			pth_sav = self.sav
+			pth_sav = self.pth_snapshot or self.sav
 		else:
-			# Store the sav case path and name of the file
+			# Store the sav case path and name of the file, any existing snapshot no longer relates to this case
 			self.sav = pth_sav
 			self.sav_name, _ = os.path.splitext(os.path.basename(pth_sav))
+			self.pth_snapshot = str()
 
 		# Load case file
 		ierr = func(sfile=pth_sav)
@@ -1691,6 +1734,29 @@ class PsseControl:
 
 		return None
 
+	def save_snapshot(self, pth_snapshot):
+		"""
+			Saves the currently loaded case so that it can be restored between contingencies without having to read the
+			original SAV case, which may be stored on a slow network drive
+		:param str pth_snapshot:  Full path to SAV case the snapshot should be saved to (ideally on a local drive)
+		:return bool success:  True / False on whether the snapshot was saved, if not then the original SAV case will
+			continue to be used when reloading
+		"""
+		func = psspy.save
+
+		ierr = func(sfile=pth_snapshot)
+		if ierr > 0:
+			self.logger.warning(('Unable to save a snapshot of the PSSE case {} to {} and so the original SAV case will '
+								 'be reloaded instead.  PSSE returned the error code {} from function <{}>')
+								.format(self.sav, pth_snapshot, ierr, func.__name__))
+			self.pth_snapshot = str()
+			success = False
+		else:
+			self.pth_snapshot = pth_snapshot
+			success = True
+
+		return success
+
 	def set_load_flow_tolerances(self):
 		"""
 			Function sets the tolerances for when performing Load Flow studies
@@ -1715,9 +1781,9 @@ class PsseControl:
 			report the errors that have occurred
 		:param bool flat_start: (optional=False) Whether to carry out a Flat Start calculation
 		:param bool lock_taps: (optional=False)
-		:return (bool, pd.DataFrame) (convergent, islanded_busbars):
+		:return (bool, np.ndarray) (convergent, islanded_busbars):
 			Returns True / False based on convergent load flow existing
-			If islanded busbars then disconnects them and returns details of all the islanded busbars in a DataFrame
+			If islanded busbars then disconnects them and returns an array of the islanded busbar numbers
 		"""
 		# Function declarations
 		if flat_start:
@@ -1771,7 +1837,7 @@ class PsseControl:
 		# Check whether load flow was convergent
 		convergent = self.check_convergent_load_flow()
 
-		return convergent, pd.DataFrame()
+		return convergent, np.array([], dtype=int)
 
 	def check_convergent_load_flow(self):
 		"""
@@ -1783,7 +1849,7 @@ class PsseControl:
 			convergent = True
 		elif error in (1, 2, 3, 5):
 			self.logger.debug(
-				'Non-convergent load flow due to a non-convergent case with error code {}'.format(error))
+				'Non-convergent load flow due to a non-convergent case with error code %s', error)
 			convergent = False
 		else:
 			self.logger.error(
@@ -1800,11 +1866,10 @@ class PsseControl:
 			something has to be done to restore the model to the pre-contingency situation afterwards.
 			Source: https://psspy.org/psse-help-forum/question/700/get-buses-numbers-when-calling-tree-function/
 
-		:return pd.DataFrame busbars: DataFrame of the busbars that have been disconnected as part of this contingency
+		:return np.ndarray busbars: Array of the busbar numbers that have been disconnected as part of this contingency
 		"""
-		# Get list of all busbars which are in service
-		# busbars_initial = handle to class <bus_data> before any changes have been made
-		busbars_initial = BusData(flag=1).df_state
+		# Get list of all busbars which are in service before any changes have been made
+		busbars_initial = self.get_in_service_busbars()
 
 		# Run ISLAND function to trip out any in-service branches connected to type 4 buses and disconnects islands
 		#   that don't contain a swing bus
@@ -1815,14 +1880,28 @@ class PsseControl:
 			raise IOError('There are no in-service buses remaining after taking this contingency')
 
 		# Get list of all busbars which are now in service
-		busbars_final = BusData(flag=1).df_state
+		busbars_final = self.get_in_service_busbars()
+
+		# Compare those which were in service initially and those which are in service now and return those which
+		# are no longer in service
+		disconnected_busbars = np.setdiff1d(busbars_initial, busbars_final)
 
-		# Compared those which were in service initially and those which are in service now and return those which
-		# are updated DataFrame to only show those which are not duplicated
-		df_disconnected_busbars = pd.concat([busbars_initial, busbars_final])
-		df_disconnected_busbars.drop_duplicates(subset=constants.Busbars.bus, keep=False, inplace=True)
+		return disconnected_busbars
+
+	def get_in_service_busbars(self):
+		"""
+			Function returns the busbar numbers of all busbars which are in service
+		:return np.ndarray busbars:  Array of the in service busbar numbers
+		"""
+		func = psspy.abusint
+		ierr, iarray = func(sid=-1, flag=1, string=(constants.Busbars.bus,))
+		if ierr > 0:
+			self.logger.critical(('Unable to retrieve the in service busbars from the SAV case and PSSE returned the '
+								  'following error code {} from the function <{}>')
+								 .format(ierr, func.__name__))
+			raise SyntaxError('Error importing data from PSSE SAV case')
 
-		return df_disconnected_busbars
+		return np.array(iarray[0], dtype=int)
 
 	def define_bus_subsystem(self, busbars=tuple()):
 		"""
@@ -2,6 +2,10 @@ import unittest
 import os
 import sys
 import time
+import numpy as np
+import pandas as pd
+import openpyxl
+import xlsxwriter
 
 TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -101,5 +105,100 @@ class TestImportContingencies(unittest.TestCase):
 
 		print('{}'.format(self.contingency_data.circuits[constants.Excel.id][1]))
 
+
+class TestReadExcel(unittest.TestCase):
+	"""
+		Functions to check that worksheets are read in read only mode in the same way as pandas would
+	"""
+	def test_read_excel_sheets(self):
+		"""
+			Test that only the requested worksheets are returned and blank rows are skipped
+		:return:
+		"""
+		file_path = os.path.join(TESTS_DIR, 'Contingencies_full.xlsx')
+		sheets = TestModule.read_excel_sheets(pth=file_path, sheet_names=(constants.Excel.busbars,))
+
+		self.assertEqual(list(sheets.keys()), [constants.Excel.busbars])
+		self.assertEqual(len(sheets[constants.Excel.busbars]), 2)
+
+	def test_rows_to_dataframe(self):
+		"""
+			Test that headers are renamed and empty trailing columns dropped in the same way as pandas
+		:return:
+		"""
+		rows = [['NUMBER', 'NUMBER', None, 'PU', None], [1, 1, 'A', 1.0, None], [2, 2, None, True, None]]
+		df = TestModule.rows_to_dataframe(rows=rows, index_col=0)
+
+		self.assertEqual(list(df.columns), ['NUMBER.1', 'Unnamed: 2', 'PU'])
+		self.assertEqual(df.index.name, 'NUMBER')
+		self.assertEqual(df.loc[2, 'PU'], 1.0)
+		self.assertTrue(pd.isna(df.loc[2, 'Unnamed: 2']))
+
+
+class TestExportResults(unittest.TestCase):
+	"""
+		Functions to check that the results are written to excel in the same layout as pandas
+	"""
+	def setUp(self):
+		self.pth_written = os.path.join(TESTS_DIR, 'test_write_sheet.xlsx')
+		self.pth_pandas = os.path.join(TESTS_DIR, 'test_write_sheet_pandas.xlsx')
+
+	@staticmethod
+	def read_cells(pth, sheet_name):
+		"""
+			Returns all of the cell values for a worksheet
+		:param str pth:  Path to the workbook
+		:param str sheet_name:  Name of the worksheet
+		:return list cells:  List of rows of cell values
+		"""
+		workbook = openpyxl.load_workbook(pth)
+		try:
+			return [list(row) for row in workbook[sheet_name].iter_rows(values_only=True)]
+		finally:
+			workbook.close()
+
+	def test_write_sheet_matches_pandas(self):
+		"""
+			Test that writing a DataFrame row by row gives the same cell values as <pd.DataFrame.to_excel> including
+			for the transposed DataFrame
+		:return:
+		"""
+		df = pd.DataFrame(
+			data={
+				'EXNAME': ['BUS_A', 'BUS_B', 'BUS_C'],
+				'BASE': [220.0, np.nan, 400.0],
+				'STEP': [np.inf, -np.inf, 0.5],
+				'STATUS': [1, 2, 4],
+				'Compliant': [True, False, True],
+				'MIXED': pd.Series(['text', 1.5, True], dtype=object)
+			},
+			index=pd.Index([300, 100, 200], name=constants.Busbars.bus)
+		)
+		frames = {'df': df, 'df_T': df.T}
+
+		export = TestModule.ExportResults.__new__(TestModule.ExportResults)
+		workbook = xlsxwriter.Workbook(self.pth_written, constants.Excel.workbook_options)
+		try:
+			format_header = workbook.add_format(constants.Excel.cell_format_header)
+			for sheet_name, frame in frames.items():
+				export.write_sheet(workbook=workbook, sheet_name=sheet_name, df=frame, cell_format_header=format_header)
+		finally:
+			workbook.close()
+
+		with pd.ExcelWriter(self.pth_pandas, engine='xlsxwriter') as writer:
+			for sheet_name, frame in frames.items():
+				frame.to_excel(writer, sheet_name=sheet_name)
+
+		for sheet_name in frames:
+			self.assertEqual(
+				self.read_cells(self.pth_written, sheet_name), self.read_cells(self.pth_pandas, sheet_name)
+			)
+
+	def tearDown(self):
+		for pth in (self.pth_written, self.pth_pandas):
+			if os.path.exists(pth):
+				os.remove(pth)
+
+
 if __name__ == '__main__':
 	unittest.main()
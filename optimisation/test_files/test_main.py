@@ -3,9 +3,12 @@
 """
 
 import unittest
+import collections
 import os
 import sys
 import time
+import numpy as np
+import pandas as pd
 
 TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
 TEST_LOGS = os.path.join(TESTS_DIR, 'logs')
@@ -87,5 +90,157 @@ class TestCompleteStudy(unittest.TestCase):
 					os.remove(pth)
 
 
+
+class TestCollectContingencyResults(unittest.TestCase):
+	"""
+		Functions to check that the results returned for each contingency are combined into the DataFrames for the
+		complete study using element data created without PSSE
+	"""
+	cont_names = ['CONT_1', 'CONT_2', 'CONT_3']
+
+	def get_element_data(self):
+		"""
+			Creates the busbar and machine data for the base case
+		:return collections.OrderedDict element_data:  Dictionary in the format {element:data class}
+		"""
+		c = optimisation.constants.Busbars
+		bus_data = optimisation.psse.BusData.__new__(optimisation.psse.BusData)
+		busbars = [100, 200, 300]
+		df = pd.DataFrame(data={c.bus: busbars, c.voltage: [1.0, 1.02, 0.98]}, index=busbars)
+		bus_data.df_voltage_steady = df.copy()
+		bus_data.df_voltage_step = df.copy()
+		# Busbar state is returned by PSSE as objects
+		bus_data.df_state = pd.DataFrame(data={c.bus: busbars, c.state: [1, 1, 3]}, index=busbars, dtype=object)
+
+		c = optimisation.constants.Machines
+		machine_data = optimisation.psse.MachineData.__new__(optimisation.psse.MachineData)
+		machine_data.df_loading = pd.DataFrame(
+			data={c.bus: [100, 300], c.qgen: [10.0, -5.0]}, index=['100_1', '300_1'], dtype=object
+		)
+
+		element_data = collections.OrderedDict()
+		element_data['bus'] = bus_data
+		element_data['machine'] = machine_data
+		return element_data
+
+	def get_contingency_results(self):
+		"""
+			Results in the format returned by <run_one_contingency> where CONT_2 is non-convergent and so does not
+			return any machine data and the busbar state for CONT_3 is returned in a different order
+		:return list contingency_results:
+		"""
+		busbars = [100, 200, 300]
+		machines = ['100_1', '300_1']
+		contingency_results = [
+			('CONT_1', 'Convergent', True, {
+				('bus', 'df_voltage_steady'): pd.Series([1.01, 1.03, 0.97], index=busbars),
+				('bus', 'df_voltage_step'): pd.Series([1.0, 1.04, 0.96], index=busbars),
+				('bus', 'df_state'): pd.Series([1, 1, 3], index=busbars, dtype=object),
+				('machine', 'df_loading'): pd.Series([12.0, -4.0], index=machines, dtype=object)
+			}),
+			('CONT_2', 'Non-convergent', False, {
+				('bus', 'df_voltage_steady'): pd.Series(np.nan, index=busbars),
+				('bus', 'df_voltage_step'): pd.Series(np.nan, index=busbars),
+				('bus', 'df_state'): pd.Series([1, np.nan, 3], index=busbars, dtype=object)
+			}),
+			('CONT_3', 'Convergent', True, {
+				('bus', 'df_voltage_steady'): pd.Series([1.0, 1.01, 0.99], index=busbars),
+				('bus', 'df_voltage_step'): pd.Series([0.99, 1.0, 0.98], index=busbars),
+				('bus', 'df_state'): pd.Series([3, np.nan, 1], index=[300, 200, 100], dtype=object),
+				('machine', 'df_loading'): pd.Series([11.0, -6.0], index=machines, dtype=object)
+			})
+		]
+		return contingency_results
+
+	def test_convergence_details(self):
+		"""
+			Test that the convergence details are returned in the order the contingencies were tested
+		:return:
+		"""
+		element_data = self.get_element_data()
+		tested, messages, flags = TestModule.collect_contingency_results(
+			element_data=element_data, contingency_results=self.get_contingency_results(), cont_names=self.cont_names)
+
+		self.assertEqual(tested, self.cont_names)
+		self.assertEqual(messages, ['Convergent', 'Non-convergent', 'Convergent'])
+		self.assertEqual(flags, [True, False, True])
+
+	def test_voltage_results(self):
+		"""
+			Test that the voltages for every contingency are added as float columns including NaN for the
+			non-convergent contingency
+		:return:
+		"""
+		element_data = self.get_element_data()
+		TestModule.collect_contingency_results(
+			element_data=element_data, contingency_results=self.get_contingency_results(), cont_names=self.cont_names)
+
+		c = optimisation.constants.Busbars
+		df = element_data['bus'].df_voltage_steady
+		self.assertEqual(df.columns.tolist(), [c.bus, c.voltage] + self.cont_names)
+		self.assertTrue(all(df[name].dtype == np.float64 for name in self.cont_names))
+		np.testing.assert_array_equal(
+			df[self.cont_names].to_numpy(),
+			np.array([[1.01, np.nan, 1.0], [1.03, np.nan, 1.01], [0.97, np.nan, 0.99]])
+		)
+		self.assertEqual(element_data['bus'].df_voltage_step['CONT_3'].tolist(), [0.99, 1.0, 0.98])
+
+	def test_reindexed_results(self):
+		"""
+			Test that results returned in a different order to the DataFrame are aligned to the DataFrame index and
+			results which are not numeric are kept as objects
+		:return:
+		"""
+		element_data = self.get_element_data()
+		TestModule.collect_contingency_results(
+			element_data=element_data, contingency_results=self.get_contingency_results(), cont_names=self.cont_names)
+
+		df = element_data['bus'].df_state
+		self.assertTrue(all(df[name].dtype == object for name in self.cont_names))
+		self.assertEqual(df['CONT_1'].tolist(), [1, 1, 3])
+		self.assertEqual(df.loc[[100, 300], 'CONT_3'].tolist(), [1, 3])
+		self.assertTrue(np.isnan(df.loc[200, 'CONT_3']))
+
+	def test_machine_results_non_convergent(self):
+		"""
+			Test that a machine column is not added for the non-convergent contingency which does not return any
+			machine data
+		:return:
+		"""
+		element_data = self.get_element_data()
+		TestModule.collect_contingency_results(
+			element_data=element_data, contingency_results=self.get_contingency_results(), cont_names=self.cont_names)
+
+		c = optimisation.constants.Machines
+		df = element_data['machine'].df_loading
+		self.assertEqual(df.columns.tolist(), [c.bus, c.qgen, 'CONT_1', 'CONT_3'])
+		self.assertEqual(df.index.tolist(), ['100_1', '300_1'])
+		# Numeric results returned as objects are still stored as floats
+		self.assertEqual(df['CONT_1'].dtype, np.float64)
+		self.assertEqual(df['CONT_3'].tolist(), [11.0, -6.0])
+
+	def test_copy_element_data(self):
+		"""
+			Test that removing the results for a contingency from the copied element data used to test contingencies in
+			this process does not affect the original element data
+		:return:
+		"""
+		element_data = self.get_element_data()
+		c = optimisation.constants.Busbars
+		element_data['bus'].voltages_exceeded_steady = list()
+		element_data_copy = TestModule.copy_element_data(element_data=element_data)
+
+		bus_data = element_data_copy['bus']
+		bus_data.df_voltage_steady['CONT_1'] = [1.01, 1.03, 0.97]
+		bus_data.df_voltage_steady.pop('CONT_1')
+		bus_data.df_voltage_step.pop(c.voltage)
+		bus_data.voltages_exceeded_steady.append(100)
+
+		self.assertEqual(element_data['bus'].df_voltage_steady.columns.tolist(), [c.bus, c.voltage])
+		self.assertEqual(element_data['bus'].df_voltage_step.columns.tolist(), [c.bus, c.voltage])
+		self.assertEqual(element_data['bus'].voltages_exceeded_steady, [])
+		self.assertIsNot(element_data_copy['machine'].df_loading, element_data['machine'].df_loading)
+
+
 if __name__ == '__main__':
 	unittest.main()
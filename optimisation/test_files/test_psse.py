@@ -1,7 +1,9 @@
 import unittest
+import collections
 import os
 import sys
 import time
+import numpy as np
 import pandas as pd
 import pickle
 
@@ -12,6 +14,7 @@ SAV_CASE_COMPLETE = os.path.join(TESTS_DIR, 'test_sav_complete.sav')
 SAV_CASE_ISLANDED = os.path.join(TESTS_DIR, 'test_sav_islanded.sav')
 
 TEST_PICKLE_FILE = os.path.join(TESTS_DIR, 'test_sav_islanded.pkl')
+TEST_SNAPSHOT_FILE = os.path.join(TESTS_DIR, 'test_sav_snapshot.sav')
 
 
 two_up = os.path.abspath(os.path.join(TESTS_DIR, '../..'))
@@ -95,27 +98,42 @@ class TestPsseControl(unittest.TestCase):
 			psse.load_data_case()
 
 	def test_load_flow_full(self):
-		load_flow_success, df = self.psse.run_load_flow()
+		load_flow_success, islanded_busbars = self.psse.run_load_flow()
 		self.assertTrue(load_flow_success)
-		self.assertTrue(df.empty)
+		self.assertEqual(islanded_busbars.size, 0)
 
 	def test_load_flow_flatstart(self):
-		load_flow_success, df = self.psse.run_load_flow(flat_start=True)
+		load_flow_success, islanded_busbars = self.psse.run_load_flow(flat_start=True)
 		self.assertTrue(load_flow_success)
-		self.assertTrue(df.empty)
+		self.assertEqual(islanded_busbars.size, 0)
 
 	def test_load_flow_locked_taps(self):
-		load_flow_success, df = self.psse.run_load_flow(lock_taps=True)
+		load_flow_success, islanded_busbars = self.psse.run_load_flow(lock_taps=True)
 		self.assertTrue(load_flow_success)
-		self.assertTrue(df.empty)
+		self.assertEqual(islanded_busbars.size, 0)
 
 	def test_load_flow_islands(self):
 		psse = TestModule.PsseControl()
 		psse.load_data_case(pth_sav=SAV_CASE_ISLANDED)
-		load_flow_success, df = self.psse.run_load_flow()
+		load_flow_success, islanded_busbars = self.psse.run_load_flow()
 		self.assertFalse(load_flow_success)
-		self.assertFalse(df.empty)
-		print(df)
+		self.assertGreater(islanded_busbars.size, 0)
+		print(islanded_busbars)
+
+	def test_save_snapshot(self):
+		psse = TestModule.PsseControl()
+		psse.load_data_case(pth_sav=SAV_CASE_COMPLETE)
+		self.assertTrue(psse.save_snapshot(pth_snapshot=TEST_SNAPSHOT_FILE))
+		self.assertEqual(psse.pth_snapshot, TEST_SNAPSHOT_FILE)
+		self.assertTrue(os.path.exists(TEST_SNAPSHOT_FILE))
+
+		# Reloading the case should now use the snapshot and loading a new case should clear it
+		psse.load_data_case()
+		load_flow_success, df = psse.run_load_flow()
+		self.assertTrue(load_flow_success)
+		psse.load_data_case(pth_sav=SAV_CASE_COMPLETE)
+		self.assertFalse(psse.pth_snapshot)
+		os.remove(TEST_SNAPSHOT_FILE)
 
 	@classmethod
 	def tearDownClass(cls):
@@ -323,6 +341,139 @@ class TestApplyPsseContingencies(unittest.TestCase):
 					os.remove(pth)
 
 
+class TestCompliance(unittest.TestCase):
+	"""
+		Functions to check the compliance of all contingencies is determined correctly
+	"""
+	def test_within_rating(self):
+		"""
+			Test that a contingency is only compliant if all loadings are less than rating unless ignored
+		:return:
+		"""
+		loading = np.array([[50.0, 120.0, 50.0, np.nan],
+							[10.0, 10.0, 200.0, 10.0]])
+		rating = np.array([[100.0], [0.0]])
+		compliant = TestModule.within_rating(loading=loading, rating=rating, ignore=rating == 0.0)
+		self.assertEqual(compliant.tolist(), [True, False, True, False])
+
+	def test_within_limits(self):
+		"""
+			Test that a contingency is only compliant if all values are within limits
+		:return:
+		"""
+		values = np.array([[1.0, 1.1, 1.0, np.nan],
+						   [0.95, 0.95, 0.9, 0.95]])
+		lower = np.array([[0.9], [0.92]])
+		upper = np.array([[1.05], [1.05]])
+		compliant = TestModule.within_limits(values=values, lower=lower, upper=upper)
+		self.assertEqual(compliant.tolist(), [True, False, False, False])
+
+	def test_within_limits_per_contingency(self):
+		"""
+			Test that a different limit can be applied to each contingency
+		:return:
+		"""
+		steps = np.array([[0.02, 0.02, 0.05],
+						  [0.01, 0.04, 0.01]])
+		compliant = TestModule.within_limits(values=steps, lower=-np.inf, upper=np.array([0.03, 0.03, 0.1]))
+		self.assertEqual(compliant.tolist(), [True, False, True])
+
+
+class TestBusDataCompliance(unittest.TestCase):
+	"""
+		Functions to check the voltage compliance of contingencies using busbar data created without PSSE
+	"""
+	circuit_conts = ['CIRCUIT_1', 'CIRCUIT_2']
+	shunt_conts = ['SHUNT_1', 'SHUNT_2']
+
+	def get_bus_data(self):
+		"""
+			Creates BusData with results for each contingency where the first contingency in each group is within the
+			voltage step limit for that group and the second is not
+		:return TestModule.BusData bus_data:
+		"""
+		c = constants.Busbars
+		bus_data = TestModule.BusData.__new__(TestModule.BusData)
+		bus_data.c = c
+		busbars = [100, 200, 300]
+		df = pd.DataFrame(
+			data={c.bus: busbars, c.voltage: [1.0, 1.02, 0.98], c.lower_limit: 0.9, c.upper_limit: 1.1},
+			index=busbars
+		)
+		# Voltage step for each contingency, compared with limits of 0.1 for circuits and 0.03 for shunts
+		steps = collections.OrderedDict()
+		steps['CIRCUIT_1'] = [0.05, -0.02, 0.0]
+		steps['CIRCUIT_2'] = [0.0, 0.12, 0.0]
+		steps['SHUNT_1'] = [0.02, 0.0, -0.01]
+		steps['SHUNT_2'] = [0.0, 0.0, -0.04]
+		for cont, step in steps.items():
+			df[cont] = df[c.voltage] + step
+
+		bus_data.df_voltage_step = df[[c.bus, c.voltage] + list(steps.keys())].copy()
+		bus_data.df_voltage_steady = df.copy()
+		return bus_data
+
+	def test_voltage_step_two_groups(self):
+		"""
+			Test that checking the voltage step for a second group of contingencies is not affected by the compliance
+			rows added when the first group was checked
+		:return:
+		"""
+		bus_data = self.get_bus_data()
+		df_circuit = bus_data.check_compliance(
+			cont_names=self.circuit_conts, voltage_step_limit=constants.EirGridThresholds.cont_step_change_limit)
+		df_shunt = bus_data.check_compliance(
+			cont_names=self.shunt_conts, voltage_step_limit=constants.EirGridThresholds.reactor_step_change_limit)
+
+		self.assertEqual(df_circuit[constants.Excel.voltage_step].tolist(), [True, False])
+		self.assertEqual(df_shunt[constants.Excel.voltage_step].tolist(), [True, False])
+
+		all_conts = self.circuit_conts + self.shunt_conts
+		compliant = bus_data.df_voltage_step.loc[constants.Contingency.compliant, all_conts]
+		self.assertEqual(compliant.tolist(), [True, False, True, False])
+
+	def test_voltage_step_limits_single_pass(self):
+		"""
+			Test that checking all groups in a single pass returns the contingencies in the order of the groups and
+			records the limit that applied to each contingency
+		:return:
+		"""
+		bus_data = self.get_bus_data()
+		step_limits = collections.OrderedDict()
+		step_limits['contingency'] = (self.circuit_conts, constants.EirGridThresholds.cont_step_change_limit)
+		step_limits['reactor'] = (self.shunt_conts, constants.EirGridThresholds.reactor_step_change_limit)
+		df_compliance = bus_data.check_compliance(step_limits=step_limits)
+
+		all_conts = self.circuit_conts + self.shunt_conts
+		self.assertEqual(df_compliance.index.tolist(), all_conts)
+		self.assertEqual(df_compliance.columns.tolist(), [constants.Excel.voltage_step])
+		self.assertEqual(df_compliance[constants.Excel.voltage_step].tolist(), [True, False, True, False])
+
+		df = bus_data.df_voltage_step
+		self.assertEqual(df.loc[constants.Contingency.compliant, all_conts].tolist(), [True, False, True, False])
+		self.assertEqual(
+			df.loc[constants.Contingency.v_step_lbl, all_conts].tolist(),
+			[constants.EirGridThresholds.cont_step_change_limit] * 2 +
+			[constants.EirGridThresholds.reactor_step_change_limit] * 2
+		)
+
+	def test_voltage_step_limit_matches_single_group(self):
+		"""
+			Test that providing a single voltage_step_limit gives the same result as a single group of step_limits
+		:return:
+		"""
+		limit = constants.EirGridThresholds.reactor_step_change_limit
+		all_conts = self.circuit_conts + self.shunt_conts
+		bus_data_limit = self.get_bus_data()
+		df_limit = bus_data_limit.check_compliance(cont_names=all_conts, voltage_step_limit=limit)
+		bus_data_group = self.get_bus_data()
+		df_group = bus_data_group.check_compliance(step_limits={'all': (all_conts, limit)})
+
+		pd.testing.assert_frame_equal(df_limit, df_group)
+		pd.testing.assert_frame_equal(bus_data_limit.df_voltage_step, bus_data_group.df_voltage_step)
+		self.assertEqual(df_limit[constants.Excel.voltage_step].tolist(), [False, False, True, False])
+
+
 class TestPickle(unittest.TestCase):
 	@classmethod
 	def setUpClass(cls):